@@ -0,0 +1,170 @@
+"""Declarative sharded crawler for large Envirofacts tables.
+
+A table is described by a spec dict instead of a hand-written loop:
+
+    SPEC = {
+        "table": "tri_reporting_form",     # Envirofacts table name
+        "asset_id": "tri_reporting_form",  # raw asset to write
+        "shard_by": {                      # filter dimensions, crossed
+            "reporting_year": list(range(1987, 2024)),
+        },
+        "page_size": 10000,                # rows per request
+        "schema": pa.schema([...]),        # typed columns
+        "columns": [...],                  # optional: keep only these
+    }
+
+`crawl(spec)` counts every shard, plans row-range pages per shard, fetches
+all pages concurrently under one rate budget and writes each page as a
+Parquet part partitioned by the shard values (e.g.
+raw/tri_reporting_form/reporting_year=2019/part-00003.parquet). Only the
+pages in flight are ever held in memory, so table size doesn't matter.
+
+Crawls are checkpointed through `save_state`: the page plan and the pages
+already written are recorded every CHECKPOINT_INTERVAL seconds and on
+SIGTERM, so a killed run (exit 137/143) resumes where it stopped instead
+of starting over.
+"""
+
+import time
+import signal
+import itertools
+import pyarrow as pa
+from epa_client import fetch_counts, fetch_many, plan_row_shards, register_table_schema, PAGE_SIZE
+from subsets_utils import open_raw_writer, load_state, save_state
+
+# Seconds between crawl checkpoints (each one is a manifest + state write)
+CHECKPOINT_INTERVAL = 30
+
+
+def plan_shards(spec: dict) -> list:
+    """Cross the spec's shard dimensions into a list of filter dicts."""
+    dimensions = spec.get("shard_by", {})
+    names = list(dimensions)
+    return [dict(zip(names, values)) for values in itertools.product(*dimensions.values())]
+
+
+def shard_prefix(filters: dict) -> str:
+    """Hive-style partition path for a shard, e.g. 'report_cycle=2019/state=CA'."""
+    return "/".join(f"{column}={value}" for column, value in filters.items())
+
+
+def conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Give every page the same schema so the partitions read back as one dataset.
+
+    Declared columns come first with their declared types (missing ones are
+    all-null); any other columns the service returns are kept as strings.
+    """
+    columns = []
+    fields = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(table.column(field.name).cast(field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, field.type))
+        fields.append(field)
+
+    for name in table.column_names:
+        if name not in schema.names:
+            columns.append(table.column(name).cast(pa.string()))
+            fields.append(pa.field(name, pa.string()))
+
+    return pa.Table.from_arrays(columns, schema=pa.schema(fields))
+
+
+def plan_pages(spec: dict) -> list:
+    """Count every shard and plan its row-range pages.
+
+    Returns:
+        List of page dicts: filters, start_row, end_row, expected_rows, part
+    """
+    shards = plan_shards(spec)
+    counts = fetch_counts([{'table_name': spec["table"], 'filters': filters} for filters in shards])
+
+    pages = []
+    for filters, count in zip(shards, counts):
+        prefix = shard_prefix(filters)
+        for i, (start, end) in enumerate(plan_row_shards(count, spec.get("page_size", PAGE_SIZE))):
+            pages.append({
+                "filters": filters,
+                "start_row": start,
+                "end_row": end,
+                "expected_rows": end - start + 1,
+                "part": f"{prefix}/part-{i:05d}" if prefix else f"part-{i:05d}",
+            })
+
+    total = sum(page["expected_rows"] for page in pages)
+    print(f"    {len(shards)} shards, {total:,} rows in {len(pages)} pages")
+    return pages
+
+
+def _exit_on_sigterm(signum, frame):
+    # Turn SIGTERM into an exception so the final checkpoint still runs
+    raise SystemExit(143)
+
+
+def crawl(spec: dict) -> int:
+    """Crawl a table described by `spec` into partitioned Parquet raw parts.
+
+    Resumes an interrupted crawl of the same asset from its last checkpoint.
+
+    Returns:
+        Total rows written
+    """
+    table_name = spec["table"]
+    asset_id = spec.get("asset_id", table_name)
+    schema = spec["schema"]
+    register_table_schema(table_name, schema)
+
+    print(f"  Crawling {table_name}...")
+
+    checkpoint = load_state(asset_id).get("crawl", {})
+    if checkpoint.get("status") == "in_progress":
+        # Reuse the stored plan: recounting could shift page boundaries
+        pages = checkpoint["pages"]
+        completed = set(checkpoint["completed"])
+        print(f"    Resuming: {len(completed)} of {len(pages)} pages already done")
+    else:
+        pages = plan_pages(spec)
+        completed = set()
+
+    pending = [i for i, page in enumerate(pages) if page["part"] not in completed]
+
+    with open_raw_writer(asset_id, fmt="parquet", resume=bool(completed)) as writer:
+        last_checkpoint = time.monotonic()
+
+        def save_checkpoint():
+            # Manifest first, so every page recorded in state has its part listed
+            writer.checkpoint()
+            save_state(asset_id, {"crawl": {"status": "in_progress", "pages": pages, "completed": sorted(completed)}})
+
+        def save_page(index, batch):
+            nonlocal last_checkpoint
+            page = pages[pending[index]]
+            writer.write(conform(batch, schema), part=page["part"])
+            completed.add(page["part"])
+            print(f"      {page['part']}: got {batch.num_rows:,} rows")
+
+            if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                save_checkpoint()
+                last_checkpoint = time.monotonic()
+
+        previous_handler = signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        try:
+            fetch_many([
+                {'table_name': table_name, 'filters': page["filters"], 'start_row': page["start_row"],
+                 'end_row': page["end_row"], 'format': 'CSV', 'arrow': True, 'expected_rows': page["expected_rows"],
+                 'columns': spec.get("columns")}
+                for page in (pages[i] for i in pending)
+            ], on_result=save_page)
+        except BaseException:
+            print(f"    Crawl interrupted, checkpointing {len(completed)} of {len(pages)} pages")
+            save_checkpoint()
+            raise
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+        total = writer.total_rows
+
+    save_state(asset_id, {"crawl": {"status": "complete", "pages": len(pages), "rows": total}})
+    print(f"  Total: {total:,} rows")
+    return total
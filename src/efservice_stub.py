@@ -0,0 +1,385 @@
+"""Local stand-in for the Envirofacts efservice API, for offline benchmarks.
+
+Serves the URL grammar `epa_client` builds:
+
+    /efservice/{table}[/{column}/=/{value}...][/rows/{start}:{end}]/{JSON|CSV|PARQUET}
+    /efservice/{table}[/{column}/=/{value}...]/count/JSON
+
+from three kinds of data, checked in this order:
+
+- recordings captured with HTTP_RECORD_DIR (exact URL replay)
+- table files in a data directory ({table}.jsonl, {table}.json or {table}.parquet)
+- synthetic rows generated from a schema
+
+Latency, transient errors, 429s and truncated pages can be injected, so
+ingest throughput, retries and rate control can be measured reproducibly.
+
+Usage:
+    python efservice_stub.py --data-dir stub_data --synthetic tri_facility=120000 \\
+        --latency 0.3 --error-rate 0.05 --truncate-rate 0.1
+
+    EPA_BASE_URL=http://127.0.0.1:8765/efservice python main.py --ingest-only
+
+Or in-process:
+    server = serve(tables={"tri_facility": rows}, port=0, latency=0.1)
+    os.environ["EPA_BASE_URL"] = server.base_url
+    ...
+    server.shutdown()
+"""
+
+import io
+import csv
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+US_STATES = ["AK", "AL", "AZ", "CA", "CO", "FL", "GA", "IL", "NY", "OH", "PA", "TX", "WA"]
+
+# Filter columns that synthetic rows fill with a small set of repeating values
+YEAR_COLUMNS = ("year", "reporting_year", "report_cycle")
+STATE_COLUMNS = ("state", "state_abbr")
+
+FORMATS = ("JSON", "CSV", "PARQUET")
+
+
+def synthetic_rows(schema, num_rows, seed=0):
+    """
+    Generate rows shaped like `schema` (a pa.Schema or list of column names).
+
+    Year/state columns cycle through realistic values so sharded crawls
+    find data in every shard; other columns get deterministic fakes.
+
+    Args:
+        schema: pa.Schema, or list of column names (all strings)
+        num_rows: Number of rows
+        seed: Seed for the numeric values
+
+    Returns:
+        List of dicts
+    """
+    rng = random.Random(seed)
+    if isinstance(schema, (list, tuple)):
+        fields = [(name, "string") for name in schema]
+    else:
+        fields = [(field.name, str(field.type)) for field in schema]
+
+    rows = []
+    for i in range(num_rows):
+        row = {}
+        for name, type_name in fields:
+            if name in YEAR_COLUMNS:
+                row[name] = 2001 + i % 23
+            elif name in STATE_COLUMNS:
+                row[name] = US_STATES[i % len(US_STATES)]
+            elif type_name.startswith("int"):
+                row[name] = i
+            elif type_name in ("double", "float"):
+                row[name] = round(rng.uniform(0, 10000), 3)
+            else:
+                row[name] = f"{name}_{i}"
+        rows.append(row)
+    return rows
+
+
+def load_table_dir(data_dir):
+    """Load {table}.jsonl / .json / .parquet files into {table: rows}."""
+    tables = {}
+    for path in sorted(Path(data_dir).iterdir()):
+        if path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                tables[path.stem] = [json.loads(line) for line in f if line.strip()]
+        elif path.suffix == ".json":
+            with open(path, encoding="utf-8") as f:
+                tables[path.stem] = json.load(f)
+        elif path.suffix == ".parquet":
+            import pyarrow.parquet as pq
+            tables[path.stem] = pq.read_table(path).to_pylist()
+    return tables
+
+
+def _replay_key(url):
+    """The part of a URL after /efservice, so recordings replay against any host."""
+    parts = urlsplit(url)
+    path = parts.path
+    marker = path.find("/efservice")
+    if marker >= 0:
+        path = path[marker + len("/efservice"):]
+    return path.rstrip("/") + (f"?{parts.query}" if parts.query else "")
+
+
+def load_recordings(path):
+    """Index a recordings.jsonl (from HTTP_RECORD_DIR) by replay key."""
+    recordings = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "body_base64" in record:
+                body = base64.b64decode(record["body_base64"])
+            else:
+                body = record.get("body", "").encode("utf-8")
+            recordings[_replay_key(record["url"])] = (record.get("status", 200), record.get("content_type", ""), body)
+    return recordings
+
+
+def parse_efservice_path(path):
+    """
+    Parse an efservice path into its parts.
+
+    Args:
+        path: URL path, e.g. /efservice/ghg_emitter_gas/year/=/2020/rows/0:9999/CSV
+
+    Returns:
+        Dict with table, filters, rows ((start, end) or None), count (bool), format
+
+    Raises:
+        ValueError: If the path doesn't follow the grammar
+    """
+    segments = [unquote(s) for s in path.split("/") if s]
+    if segments and segments[0] == "efservice":
+        segments = segments[1:]
+    if not segments:
+        raise ValueError("missing table name")
+
+    table = segments[0]
+    rest = segments[1:]
+    filters = {}
+    rows = None
+    count = False
+    format = "JSON"
+
+    i = 0
+    while i < len(rest):
+        segment = rest[i]
+        if segment == "count":
+            count = True
+            i += 1
+        elif segment == "rows" and i + 1 < len(rest):
+            start, _, end = rest[i + 1].partition(":")
+            rows = (int(start), int(end))
+            i += 2
+        elif segment.upper() in FORMATS and i == len(rest) - 1:
+            format = segment.upper()
+            i += 1
+        elif i + 2 < len(rest) and rest[i + 1] == "=":
+            filters[segment] = rest[i + 2]
+            i += 3
+        else:
+            raise ValueError(f"unexpected path segment {segment!r}")
+
+    return {"table": table, "filters": filters, "rows": rows, "count": count, "format": format}
+
+
+def _matches(row, filters):
+    for column, value in filters.items():
+        if str(row.get(column, "")).lower() != str(value).lower():
+            return False
+    return True
+
+
+def _encode(rows, format):
+    if format == "JSON":
+        return "application/json", json.dumps(rows).encode("utf-8")
+
+    if format == "PARQUET":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_pylist(rows), buffer)
+        return "application/octet-stream", buffer.getvalue()
+
+    out = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return "text/csv", out.getvalue().encode("utf-8")
+
+
+class StubServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer holding the stub's data, fault settings and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, tables=None, recordings=None, synthetic=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, truncate_rate=0.0, max_page_rows=None, seed=0):
+        super().__init__(address, StubHandler)
+        self.tables = dict(tables or {})
+        self.recordings = recordings or {}
+        self.synthetic = synthetic or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.truncate_rate = truncate_rate
+        self.max_page_rows = max_page_rows
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "truncated": 0, "replayed": 0, "not_found": 0}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/efservice"
+
+    def rows(self, table):
+        with self.lock:
+            if table not in self.tables and table in self.synthetic:
+                schema, num_rows = self.synthetic[table]
+                self.tables[table] = synthetic_rows(schema, num_rows)
+        return self.tables.get(table)
+
+    def roll(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, headers=None):
+        self._send(status, "application/json", json.dumps({"error": message}).encode("utf-8"), headers)
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+
+        delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if server.roll(server.throttle_rate):
+            server.count("throttled")
+            return self._send_error(429, "Too Many Requests", {"Retry-After": "1"})
+        if server.roll(server.error_rate):
+            server.count("errors")
+            return self._send_error(server.random.choice([500, 502, 503]), "Injected failure")
+
+        replay = server.recordings.get(_replay_key(self.path))
+        if replay is not None:
+            server.count("replayed")
+            status, content_type, body = replay
+            return self._send(status, content_type or "application/json", body)
+
+        try:
+            query = parse_efservice_path(urlsplit(self.path).path)
+        except ValueError as e:
+            return self._send_error(400, str(e))
+
+        rows = server.rows(query["table"])
+        if rows is None:
+            server.count("not_found")
+            return self._send_error(404, f"Unknown table {query['table']}")
+
+        matched = [row for row in rows if _matches(row, query["filters"])]
+
+        if query["count"]:
+            return self._send(200, "application/json", json.dumps([{"TOTALQUERYRESULTS": len(matched)}]).encode("utf-8"))
+
+        if query["rows"]:
+            start, end = query["rows"]
+            matched = matched[start:end + 1]
+        if server.max_page_rows is not None:
+            matched = matched[:server.max_page_rows]
+        if len(matched) > 1 and server.roll(server.truncate_rate):
+            # Envirofacts sometimes answers 200 with only part of the range
+            server.count("truncated")
+            matched = matched[:len(matched) // 2]
+
+        content_type, body = _encode(matched, query["format"])
+        self._send(200, content_type, body)
+
+
+def serve(tables=None, recordings=None, synthetic=None, host="127.0.0.1", port=8765, background=True, **faults):
+    """
+    Start the stub server.
+
+    Args:
+        tables: Dict of {table_name: list of row dicts}
+        recordings: Dict from `load_recordings`, replayed by exact URL
+        synthetic: Dict of {table_name: (schema, num_rows)}, generated on first use
+        host, port: Address to listen on (port=0 picks a free port)
+        background: Serve from a daemon thread and return immediately
+        **faults: latency, jitter (seconds), error_rate, throttle_rate,
+            truncate_rate (0-1), max_page_rows, seed
+
+    Returns:
+        StubServer; `server.base_url` is the value for EPA_BASE_URL,
+        `server.stats` counts served/injected responses
+    """
+    server = StubServer((host, port), tables, recordings, synthetic, **faults)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Envirofacts efservice stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", help="Directory of {table}.jsonl/.json/.parquet files")
+    parser.add_argument("--recordings", help="recordings.jsonl captured with HTTP_RECORD_DIR")
+    parser.add_argument("--synthetic", action="append", default=[], metavar="TABLE=ROWS",
+                        help="Generate ROWS synthetic rows for TABLE (schema from TABLE_SCHEMAS / ingest specs)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 5xx")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of pages cut to half their rows")
+    parser.add_argument("--max-page-rows", type=int, help="Never return more rows than this per page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tables = load_table_dir(args.data_dir) if args.data_dir else {}
+    recordings = load_recordings(args.recordings) if args.recordings else {}
+
+    synthetic = {}
+    if args.synthetic:
+        from epa_client import TABLE_SCHEMAS
+        from ingest import br_reporting, tri_reporting_form
+        schemas = {**TABLE_SCHEMAS, br_reporting.SPEC["table"]: br_reporting.SPEC["schema"],
+                   tri_reporting_form.SPEC["table"]: tri_reporting_form.SPEC["schema"]}
+        for spec in args.synthetic:
+            table, _, num_rows = spec.partition("=")
+            if table not in schemas:
+                sys.exit(f"No schema known for synthetic table {table}")
+            synthetic[table] = (schemas[table], int(num_rows))
+
+    print(f"efservice stub on http://{args.host}:{args.port}/efservice "
+          f"({len(tables)} tables, {len(recordings)} recordings, {len(synthetic)} synthetic)")
+    print(f"  export EPA_BASE_URL=http://{args.host}:{args.port}/efservice")
+    try:
+        serve(tables, recordings, synthetic, args.host, args.port, background=False,
+              latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+              throttle_rate=args.throttle_rate, truncate_rate=args.truncate_rate,
+              max_page_rows=args.max_page_rows, seed=args.seed)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,464 @@
 # Add parent directory (connector root) to path for utils
 
-"""EPA Envirofacts API client with rate limiting."""
+"""EPA Envirofacts API client with adaptive rate control."""
 
+import io
+import os
 import time
-from ratelimit import limits, sleep_and_retry
-from subsets_utils import get
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+import subsets_utils
+from subsets_utils import (
+    get, async_get, send_streaming, shared_rate_limit, async_send_streaming, iter_json_array, aiter_json_array, debug, retry_policy,
+    CircuitOpenError,
+)
+
+# EPA_BASE_URL points the client elsewhere, e.g. at a local efservice_stub
+BASE_URL = os.environ.get("EPA_BASE_URL", "https://data.epa.gov/efservice")
+
+# Initial concurrent requests in flight; `rate_controller` adapts it from there
+MAX_CONCURRENCY = 5
+
+# Rows per shard when paginating a whole table (inclusive ranges: 0:9999)
+PAGE_SIZE = 10000
+
+# Smallest row range `fetch_range_async` will bisect down to before giving up
+MIN_SPLIT_ROWS = 500
+
+# With an `on_result` callback, at most this many results are fetching or
+# waiting for the callback at once, bounding memory when writes fall behind
+MAX_PENDING_RESULTS = 32
+
+# Wire formats that can be decoded straight into Arrow (see `get_table_data(arrow=True)`)
+ARROW_FORMATS = ('CSV', 'PARQUET')
+
+# Typed schemas for the columns we rely on, per table. Columns not listed
+# here keep Arrow's inferred type. Identifier-like columns are pinned to
+# string so leading zeros (ZIP codes, registry ids) survive CSV decoding.
+TABLE_SCHEMAS = {
+    'tri_facility': pa.schema([
+        ('tri_facility_id', pa.string()),
+        ('facility_name', pa.string()),
+        ('street_address', pa.string()),
+        ('city_name', pa.string()),
+        ('county_name', pa.string()),
+        ('state_abbr', pa.string()),
+        ('zip_code', pa.string()),
+        ('region', pa.string()),
+        ('pref_latitude', pa.float64()),
+        ('pref_longitude', pa.float64()),
+        ('parent_co_name', pa.string()),
+        ('epa_registry_id', pa.string()),
+        ('fac_closed_ind', pa.string()),
+    ]),
+    'ghg_emitter_gas': pa.schema([
+        ('facility_id', pa.int64()),
+        ('year', pa.int64()),
+        ('state', pa.string()),
+        ('state_name', pa.string()),
+        ('gas_code', pa.string()),
+        ('gas_name', pa.string()),
+        ('co2e_emission', pa.float64()),
+    ]),
+    'ghg_emitter_sector': pa.schema([
+        ('facility_id', pa.int64()),
+        ('year', pa.int64()),
+        ('state', pa.string()),
+        ('sector_name', pa.string()),
+        ('gas_code', pa.string()),
+        ('co2e_emission', pa.float64()),
+    ]),
+}
+
+
+def register_table_schema(table_name, schema):
+    """Declare the typed schema used to decode `table_name` in Arrow mode."""
+    TABLE_SCHEMAS[table_name] = schema
+
+
+class IncompleteDataError(Exception):
+    """A row range could not be fetched completely, even after bisection."""
+
+
+class RateController:
+    """Adaptive (AIMD) request rate and concurrency limit for Envirofacts.
+
+    Every request takes a slot with `acquire()` (or `acquire_async()`) and
+    reports back with `release()`. While requests succeed and latency stays
+    near its best observed level for that kind of endpoint (/count calls are
+    far faster than row pages, so each class keeps its own baseline, which
+    drifts up slowly so one early fast sample can't pin it), rate and
+    concurrency grow additively
+    (about +`increase` req/s per second of healthy traffic). A 429, 5xx or
+    timeout cuts both multiplicatively, at most once per `cooldown` seconds
+    so one burst of failures counts as one congestion event.
+
+    Thread-safe and not bound to an event loop, so sync and async callers
+    share one budget. Current state is available from `metrics()` and is
+    logged to rate_control.csv on every adjustment.
+
+    With a `shared_limit` (see subsets_utils.shared_rate_limit), every slot
+    also takes a token from a bucket shared with other worker processes,
+    so the total rate stays capped however many workers run. Pass
+    `shared_key` instead to look the limit up on every request, so a
+    coordinator installed later with set_rate_coordinator() is honoured.
+    """
+
+    def __init__(self, rate=5.0, concurrency=MAX_CONCURRENCY, min_rate=0.5, max_rate=20.0,
+                 min_concurrency=1, max_concurrency=16, increase=0.5, decrease=0.5,
+                 slow_factor=2.0, cooldown=2.0, baseline_drift=0.01, shared_limit=None, shared_key=None):
+        self.rate = rate
+        self.concurrency = float(concurrency)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self.cooldown = cooldown
+        self.baseline_drift = baseline_drift
+        self.shared_limit = shared_limit
+        self.shared_key = shared_key
+
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self._next_slot = 0.0
+        self._last_decrease = 0.0
+        # Per endpoint class ("count", "rows"): smoothed latency and its best level
+        self._latency_ewma = {}
+        self._latency_baseline = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Reserve a local slot if one is free; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self.in_flight >= int(self.concurrency):
+                return 0.05
+            if now < self._next_slot:
+                return self._next_slot - now
+            self.in_flight += 1
+            self._next_slot = now + 1.0 / self.rate
+            return None
+
+    def _unreserve(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _get_shared_limit(self):
+        # Looked up per request so a coordinator installed after import still applies
+        if self.shared_limit is not None:
+            return self.shared_limit
+        return shared_rate_limit(self.shared_key) if self.shared_key else None
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if wait is None:
+                limit = self._get_shared_limit()
+                # The shared take may block on a file lock, so it runs outside self._lock
+                wait = limit.try_take() if limit is not None else 0.0
+                if wait <= 0:
+                    return
+                self._unreserve()
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._reserve()
+            if wait is None:
+                limit = self._get_shared_limit()
+                wait = await asyncio.to_thread(limit.try_take) if limit is not None else 0.0
+                if wait <= 0:
+                    return
+                self._unreserve()
+            await asyncio.sleep(wait)
+
+    def release(self, latency, status=None, error=None, endpoint_class="rows"):
+        """Report a finished request and adapt rate/concurrency.
+
+        Args:
+            latency: Request duration in seconds, or None when it says nothing
+                about the server (e.g. a cache hit); such successes don't adapt
+            status: HTTP status code, if a response came back
+            error: Exception raised instead of a response, if any
+            endpoint_class: Which latency baseline the sample belongs to
+        """
+        failed = error is not None or status == 429 or (status is not None and status >= 500)
+
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if failed:
+                self.failures += 1
+                if now - self._last_decrease < self.cooldown:
+                    return
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease)
+                event = "decrease"
+            else:
+                self.successes += 1
+                if latency is None:
+                    return
+                previous = self._latency_ewma.get(endpoint_class)
+                ewma = latency if previous is None else 0.8 * previous + 0.2 * latency
+                self._latency_ewma[endpoint_class] = ewma
+                baseline = self._latency_baseline.get(endpoint_class, ewma)
+                baseline = min(ewma, baseline * (1.0 + self.baseline_drift))
+                self._latency_baseline[endpoint_class] = baseline
+                if ewma > self.slow_factor * baseline:
+                    return
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+                event = "increase"
+
+            metrics = self._metrics()
+
+        if event == "decrease":
+            print(f"      Backing off to {metrics['rate']} req/s, {metrics['concurrency']} concurrent "
+                  f"({'error' if error is not None else status})")
+        debug.log_rate_control(event, **metrics)
+
+    def _metrics(self):
+        return {
+            "rate": round(self.rate, 2),
+            "concurrency": int(self.concurrency),
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+    def metrics(self):
+        """Current rate (req/s), concurrency limit, in-flight count and totals."""
+        with self._lock:
+            return self._metrics()
+
+
+# One controller per process, shared by sync and async requests. With
+# HTTP_RATE_LIMIT_FILE set, all processes on the host also share one
+# HTTP_SHARED_RATE req/s bucket for the Envirofacts host.
+rate_controller = RateController(shared_key=httpx.URL(BASE_URL).host)
+
+
+def _endpoint_class(endpoint):
+    """Latency class of an endpoint for `rate_controller`: "count" or "rows"."""
+    return "count" if "/count/" in f"/{endpoint}/" else "rows"
+
+
+def _latency_sample(response, start):
+    """Seconds since `start`, or None for responses served from the HTTP cache."""
+    if response.extensions.get("cache") in ("hit", "revalidated"):
+        return None
+    return time.monotonic() - start
 
-BASE_URL = "https://data.epa.gov/efservice"
 
 # EPA Envirofacts has a 15-minute timeout per request
-# Be conservative with rate limiting
-@sleep_and_retry
-@limits(calls=5, period=1)
-def rate_limited_get(endpoint, params=None, retries=3):
-    """Make a rate-limited GET request to EPA Envirofacts API with retries."""
+def rate_limited_get(endpoint, params=None):
+    """Make a rate-controlled GET request to EPA Envirofacts API.
+
+    Transient failures are retried by the shared `retry_policy`; each
+    attempt takes its own slot from `rate_controller`.
+    """
     url = f"{BASE_URL}/{endpoint}"
 
-    for attempt in range(retries):
-        response = get(url, params=params, timeout=120.0)
-        if response.status_code == 500 and attempt < retries - 1:
-            wait = 2 ** attempt  # exponential backoff: 1s, 2s, 4s
-            print(f"      API returned 500, retrying in {wait}s...")
-            time.sleep(wait)
-            continue
+    def send():
+        rate_controller.acquire()
+        start = time.monotonic()
+        try:
+            response = get(url, params=params, timeout=120.0)
+        except Exception as e:
+            rate_controller.release(time.monotonic() - start, error=e)
+            raise
+        rate_controller.release(_latency_sample(response, start), status=response.status_code,
+                                endpoint_class=_endpoint_class(endpoint))
+        return response
+
+    return retry_policy.call(url, send)
+
+
+def rate_limited_stream(endpoint, params=None):
+    """Like `rate_limited_get`, but the body is left unread for streaming.
+
+    The rate slot covers the time to response headers. Close the
+    returned response once its body has been consumed.
+    """
+    url = f"{BASE_URL}/{endpoint}"
+
+    def send():
+        rate_controller.acquire()
+        start = time.monotonic()
+        try:
+            response = send_streaming("GET", url, params=params, timeout=120.0)
+        except Exception as e:
+            rate_controller.release(time.monotonic() - start, error=e)
+            raise
+        rate_controller.release(_latency_sample(response, start), status=response.status_code,
+                                endpoint_class=_endpoint_class(endpoint))
         return response
 
-    return response
+    return retry_policy.call(url, send)
+
+
+def create_async_client(max_connections=None):
+    """Create a shared-config async client with enough connections for the rate controller."""
+    max_connections = max_connections or rate_controller.max_concurrency
+    return subsets_utils.create_async_client(
+        timeout=120.0,
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+
+
+async def async_rate_limited_get(client, endpoint, params=None):
+    """Async counterpart of `rate_limited_get`, sharing its rate budget and retry policy."""
+    url = f"{BASE_URL}/{endpoint}"
+
+    async def send():
+        await rate_controller.acquire_async()
+        start = time.monotonic()
+        try:
+            response = await async_get(client, url, params=params)
+        except Exception as e:
+            rate_controller.release(time.monotonic() - start, error=e)
+            raise
+        rate_controller.release(_latency_sample(response, start), status=response.status_code,
+                                endpoint_class=_endpoint_class(endpoint))
+        return response
+
+    return await retry_policy.call_async(url, send)
+
+
+async def async_rate_limited_stream(client, endpoint, params=None):
+    """Async counterpart of `rate_limited_stream`; close with `await response.aclose()`."""
+    url = f"{BASE_URL}/{endpoint}"
+
+    async def send():
+        await rate_controller.acquire_async()
+        start = time.monotonic()
+        try:
+            response = await async_send_streaming(client, "GET", url, params=params)
+        except Exception as e:
+            rate_controller.release(time.monotonic() - start, error=e)
+            raise
+        rate_controller.release(_latency_sample(response, start), status=response.status_code,
+                                endpoint_class=_endpoint_class(endpoint))
+        return response
+
+    return await retry_policy.call_async(url, send)
+
+
+def _table_path(table_name, filters=None):
+    """Build the table/filter prefix of an efservice path: table/col/=/val/..."""
+    endpoint_parts = [table_name]
+
+    if filters:
+        for column, value in filters.items():
+            endpoint_parts.append(f"{column}/=/{value}")
+
+    return endpoint_parts
+
+
+def _build_endpoint(table_name, filters=None, start_row=0, end_row=10000, format='JSON'):
+    """Build an efservice path: table/col/=/val/.../rows/start:end/FORMAT."""
+    endpoint_parts = _table_path(table_name, filters)
+    endpoint_parts.append(f"rows/{start_row}:{end_row}")
+    endpoint_parts.append(format)
+
+    return '/'.join(endpoint_parts)
+
 
+def _apply_schema(table, schema):
+    """Cast the columns `schema` declares to their declared types; others are left as is."""
+    if schema:
+        for field in schema:
+            if field.name in table.column_names and table.schema.field(field.name).type != field.type:
+                index = table.column_names.index(field.name)
+                table = table.set_column(index, field, table.column(field.name).cast(field.type))
+    return table
 
-def get_table_data(table_name, filters=None, start_row=0, end_row=10000, format='JSON'):
+
+def _project_records(records, columns):
+    """Keep only `columns` of each record (missing ones as None), in that order."""
+    if not columns:
+        yield from records
+        return
+    for record in records:
+        yield {column: record.get(column) for column in columns}
+
+
+def _records_to_arrow(records, table_name):
+    """Build a pa.Table from JSON records, typed with the table's schema where declared."""
+    return _apply_schema(pa.Table.from_pylist(records), TABLE_SCHEMAS.get(table_name))
+
+
+def _batched(records, batch_size, table_name):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield _records_to_arrow(batch, table_name)
+            batch = []
+    if batch:
+        yield _records_to_arrow(batch, table_name)
+
+
+def _decode_arrow(content, table_name, format, columns=None):
+    """Decode a CSV or Parquet body into a pa.Table using the table's typed schema.
+
+    With `columns`, only those columns are decoded (others are skipped by
+    the parser, not dropped afterwards); requested columns the body lacks
+    come back all-null.
+    """
+    schema = TABLE_SCHEMAS.get(table_name)
+
+    if not content.strip():
+        if schema and columns:
+            return pa.schema([
+                schema.field(c) if c in schema.names else pa.field(c, pa.string()) for c in columns
+            ]).empty_table()
+        return schema.empty_table() if schema else pa.table({})
+
+    if format == 'PARQUET':
+        read_columns = None
+        if columns:
+            available = pq.ParquetFile(io.BytesIO(content)).schema_arrow.names
+            read_columns = [c for c in columns if c in available]
+        return _apply_schema(pq.read_table(io.BytesIO(content), columns=read_columns), schema)
+
+    convert_options = pv.ConvertOptions(
+        column_types={field.name: field.type for field in schema} if schema else None,
+        strings_can_be_null=True,
+        include_columns=columns,
+        include_missing_columns=bool(columns),
+    )
+    return pv.read_csv(io.BytesIO(content), convert_options=convert_options)
+
+
+def _decode_response_empty(table_name, format, arrow=False, columns=None):
+    """What `_decode_response` returns for a range with no rows."""
+    if format == 'PARQUET' or (arrow and format in ARROW_FORMATS):
+        return _decode_arrow(b"", table_name, format, columns)
+    return []
+
+
+def _decode_response(response, table_name, format, arrow=False, columns=None):
+    if format == 'JSON':
+        return list(_project_records(response.json(), columns))
+    if format == 'PARQUET' or (arrow and format in ARROW_FORMATS):
+        return _decode_arrow(response.content, table_name, format, columns)
+    return response.text
+
+
+def get_table_data(table_name, filters=None, start_row=0, end_row=10000, format='JSON', arrow=False, columns=None):
     """
     Get data from an Envirofacts table.
 
@@ -37,32 +467,380 @@ def get_table_data(table_name, filters=None, start_row=0, end_row=10000, format=
         filters: Dict of column filters (e.g., {'state_abbr': 'CA'})
         start_row: Starting row number
         end_row: Ending row number
-        format: Output format (JSON, CSV, XML)
+        format: Output format (JSON, CSV, PARQUET, XML)
+        arrow: Decode CSV straight into a pa.Table (PARQUET always is),
+            typed with TABLE_SCHEMAS, instead of returning text
+        columns: Only keep these columns. efservice has no column
+            selection, so the projection happens while decoding: unused
+            fields never reach records, Arrow tables or the raw store.
+            Text formats (CSV/XML without arrow) are returned unprojected.
 
     Returns:
-        List of records or text depending on format
+        List of records, pa.Table, or text depending on format
     """
-    # Build the endpoint path
-    endpoint_parts = [table_name]
+    if format == 'JSON' and not arrow:
+        return list(iter_table_data(table_name, filters, start_row, end_row, columns=columns))
 
-    if filters:
-        for column, value in filters.items():
-            endpoint_parts.append(f"{column}/=/{value}")
+    endpoint = _build_endpoint(table_name, filters, start_row, end_row, format)
 
-    endpoint_parts.append(f"rows/{start_row}:{end_row}")
-    endpoint_parts.append(format)
+    response = rate_limited_get(endpoint)
+    response.raise_for_status()
+
+    return _decode_response(response, table_name, format, arrow, columns)
 
-    endpoint = '/'.join(endpoint_parts)
+
+def iter_table_data(table_name, filters=None, start_row=0, end_row=10000, batch_size=None, columns=None):
+    """
+    Stream a JSON row range, yielding records while the body is still downloading.
+
+    Only the record being parsed is buffered, never the whole body, so
+    peak memory is bounded by what the caller keeps.
+
+    Args:
+        table_name, filters, start_row, end_row, columns: as in `get_table_data`
+        batch_size: Yield pa.Tables of this many rows (typed with
+            TABLE_SCHEMAS) instead of individual records
+
+    Yields:
+        Records (dicts), or pa.Tables when batch_size is given
+    """
+    endpoint = _build_endpoint(table_name, filters, start_row, end_row, 'JSON')
+
+    response = rate_limited_stream(endpoint)
+    try:
+        response.raise_for_status()
+        records = _project_records(iter_json_array(response.iter_bytes()), columns)
+        if batch_size:
+            yield from _batched(records, batch_size, table_name)
+        else:
+            yield from records
+    finally:
+        response.close()
+
+
+async def get_table_data_async(client, table_name, filters=None, start_row=0, end_row=10000, format='JSON', arrow=False,
+                               columns=None):
+    """
+    Async variant of `get_table_data`.
+
+    Args:
+        client: async client from `create_async_client`
+        table_name, filters, start_row, end_row, format, arrow, columns: as in `get_table_data`
+
+    Returns:
+        List of records, pa.Table, or text depending on format
+    """
+    endpoint = _build_endpoint(table_name, filters, start_row, end_row, format)
+
+    if format == 'JSON' and not arrow:
+        # Parse while downloading instead of holding bytes, text and records at once
+        response = await async_rate_limited_stream(client, endpoint)
+        try:
+            response.raise_for_status()
+            records = []
+            async for record in aiter_json_array(response.aiter_bytes()):
+                records.extend(_project_records([record], columns))
+            return records
+        finally:
+            await response.aclose()
+
+    response = await async_rate_limited_get(client, endpoint)
+    response.raise_for_status()
+
+    return _decode_response(response, table_name, format, arrow, columns)
+
+
+def _parse_count(payload):
+    """Extract the row count from an efservice /count JSON response.
+
+    The service answers with e.g. [{"TOTALQUERYRESULTS": 64990}].
+    """
+    if isinstance(payload, list):
+        payload = payload[0] if payload else {}
+    if isinstance(payload, dict):
+        for value in payload.values():
+            return int(value)
+        return 0
+    return int(payload)
+
+
+def get_table_count(table_name, filters=None):
+    """
+    Get the number of rows in an Envirofacts table (after filters).
+
+    Args:
+        table_name: The table name (e.g., 'tri_facility')
+        filters: Dict of column filters (e.g., {'state_abbr': 'CA'})
+
+    Returns:
+        Row count as int
+    """
+    endpoint = '/'.join(_table_path(table_name, filters) + ['count', 'JSON'])
 
     response = rate_limited_get(endpoint)
     response.raise_for_status()
 
-    if format == 'JSON':
-        return response.json()
-    return response.text
+    return _parse_count(response.json())
+
+
+async def get_table_count_async(client, table_name, filters=None):
+    """Async variant of `get_table_count`."""
+    endpoint = '/'.join(_table_path(table_name, filters) + ['count', 'JSON'])
+
+    response = await async_rate_limited_get(client, endpoint)
+    response.raise_for_status()
+
+    return _parse_count(response.json())
+
+
+def fetch_counts(requests):
+    """
+    Count many (filtered) tables concurrently within one shared rate budget.
+
+    Args:
+        requests: List of dicts of `get_table_count` keyword arguments
+            (table_name, filters)
+
+    Returns:
+        List of row counts, in the same order as `requests`
+    """
+    return asyncio.run(_gather_requests(get_table_count_async, requests, None))
+
+
+def plan_row_shards(total_rows, page_size=PAGE_SIZE):
+    """
+    Split a row count into inclusive row-range shards.
+
+    Args:
+        total_rows: Number of rows in the table (from `get_table_count`)
+        page_size: Rows per shard
+
+    Returns:
+        List of (start_row, end_row) tuples, e.g. 25000 rows ->
+        [(0, 9999), (10000, 19999), (20000, 24999)]
+    """
+    return [
+        (start, min(start + page_size, total_rows) - 1)
+        for start in range(0, total_rows, page_size)
+    ]
+
+
+def _page_rows(page):
+    if isinstance(page, pa.Table):
+        return page.num_rows
+    return len(page)
+
+
+def _concat_pages(pages):
+    """Stitch pages (record lists or pa.Tables) back together in order."""
+    if pages and isinstance(pages[0], pa.Table):
+        return pa.concat_tables(pages, promote_options="default")
+
+    records = []
+    for page in pages:
+        records.extend(page)
+    return records
+
+
+def _is_splittable_error(error):
+    """Server-side failures and timeouts are worth retrying on a smaller range."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+async def _get_range_async(client, table_name, filters, start_row, end_row, format, arrow, columns):
+    """`get_table_data_async`, waiting out an open circuit instead of failing the range."""
+    while True:
+        try:
+            return await get_table_data_async(client, table_name, filters, start_row, end_row, format, arrow, columns)
+        except CircuitOpenError as e:
+            # The host is paused, not this range: splitting would not help
+            print(f"      Rows {start_row:,}-{end_row:,}: {e}, waiting...")
+            await asyncio.sleep(e.retry_in)
+
+
+async def fetch_range_async(client, table_name, filters=None, start_row=0, end_row=10000,
+                            format='JSON', arrow=False, expected_rows=None, columns=None):
+    """
+    Fetch a row range, bisecting it on failure and re-fetching truncated tails.
+
+    A range that still fails after `retry_policy`'s retries (5xx, timeout,
+    dropped connection) is split in half and each half fetched on
+    its own, recursively, down to MIN_SPLIT_ROWS. When `expected_rows` is
+    known (from `plan_row_shards` over `get_table_count`), a short page is
+    treated as truncated and only the missing tail is fetched again. While
+    the host's circuit is open the range waits for it rather than failing.
+
+    Args:
+        client, table_name, filters, start_row, end_row, format, arrow, columns:
+            as in `get_table_data_async`
+        expected_rows: Rows the range should contain, or None if unknown
+
+    Returns:
+        List of records or pa.Table, in row order
+
+    Raises:
+        IncompleteDataError: If a range cannot be fetched completely
+    """
+    if expected_rows == 0:
+        return _decode_response_empty(table_name, format, arrow, columns)
+
+    span = end_row - start_row + 1
+
+    try:
+        page = await _get_range_async(client, table_name, filters, start_row, end_row, format, arrow, columns)
+    except Exception as e:
+        if not _is_splittable_error(e):
+            raise
+        if span <= MIN_SPLIT_ROWS:
+            raise IncompleteDataError(f"{table_name} rows {start_row}:{end_row} failed at minimum range size: {e}") from e
+        print(f"      Rows {start_row:,}-{end_row:,} failed ({type(e).__name__}), splitting...")
+        return await _fetch_halves(client, table_name, filters, start_row, end_row, format, arrow, expected_rows, columns)
+
+    got = _page_rows(page)
+    if expected_rows is None or got >= expected_rows:
+        return page
+
+    if got == 0:
+        # Nothing came back at all: shrink the range like a failure would
+        if span <= MIN_SPLIT_ROWS:
+            raise IncompleteDataError(
+                f"{table_name} rows {start_row}:{end_row} returned 0 of {expected_rows:,} expected rows"
+            )
+        print(f"      Rows {start_row:,}-{end_row:,} came back empty, splitting...")
+        return await _fetch_halves(client, table_name, filters, start_row, end_row, format, arrow, expected_rows, columns)
+
+    print(f"      Rows {start_row:,}-{end_row:,} truncated ({got:,} of {expected_rows:,}), fetching the rest...")
+    rest = await fetch_range_async(
+        client, table_name, filters, start_row + got, end_row, format, arrow, expected_rows - got, columns
+    )
+    return _concat_pages([page, rest])
+
+
+async def _fetch_halves(client, table_name, filters, start_row, end_row, format, arrow, expected_rows, columns=None):
+    """Fetch both halves of a range concurrently and stitch them in order."""
+    mid = start_row + (end_row - start_row + 1) // 2 - 1
+    left_expected = right_expected = None
+    if expected_rows is not None:
+        left_expected = min(expected_rows, mid - start_row + 1)
+        right_expected = expected_rows - left_expected
+
+    pages = await asyncio.gather(
+        fetch_range_async(client, table_name, filters, start_row, mid, format, arrow, left_expected, columns),
+        fetch_range_async(client, table_name, filters, mid + 1, end_row, format, arrow, right_expected, columns),
+    )
+    return _concat_pages(pages)
+
+
+async def _gather_requests(fetch, requests, on_result):
+    """Run `fetch(client, **request)` for every request on one client.
+
+    All requests are scheduled at once; `rate_controller` decides how many
+    are actually in flight. `on_result` runs on a single worker thread, so
+    callbacks (Parquet writes, uploads, state saves) never stall downloads
+    and never run concurrently with each other.
+    """
+    if on_result is None:
+        async with create_async_client() as client:
+            return await asyncio.gather(*[fetch(client, **request) for request in requests])
+
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Semaphore(MAX_PENDING_RESULTS)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="on_result") as executor:
+        async with create_async_client() as client:
+            async def _fetch(index, request):
+                async with pending:
+                    result = await fetch(client, **request)
+                    await loop.run_in_executor(executor, on_result, index, result)
+
+            return await asyncio.gather(*[_fetch(i, request) for i, request in enumerate(requests)])
+
+
+async def fetch_many_async(requests, on_result=None):
+    """
+    Fetch many row-range requests concurrently within one shared rate budget.
+
+    Each request goes through `fetch_range_async`, so failing ranges are
+    bisected and, when `expected_rows` is given, truncated pages completed.
+
+    Args:
+        requests: List of dicts of `fetch_range_async` keyword arguments
+            (table_name, filters, start_row, end_row, format, arrow, expected_rows, columns)
+        on_result: Optional callback `on_result(index, result)` invoked as each
+            request completes, on a worker thread (one call at a time). Results
+            handed to the callback are not retained, and at most
+            MAX_PENDING_RESULTS are held at once, so memory stays bounded.
+
+    Returns:
+        List of results, in the same order as `requests`
+        (entries are None when `on_result` is given)
+    """
+    return await _gather_requests(fetch_range_async, requests, on_result)
+
+
+def fetch_many(requests, on_result=None):
+    """Synchronous entry point for `fetch_many_async`."""
+    return asyncio.run(fetch_many_async(requests, on_result))
+
+
+async def fetch_table_async(client, table_name, filters=None, page_size=PAGE_SIZE, format='JSON', arrow=False,
+                            columns=None):
+    """
+    Fetch a whole (filtered) table: count first, then all shards concurrently.
+
+    Every shard knows how many rows it should hold, so truncated pages are
+    detected and completed rather than silently dropped.
+
+    Args:
+        client: async client from `create_async_client`
+        table_name: The table name
+        filters: Dict of column filters
+        page_size: Rows per shard
+        format, arrow, columns: as in `get_table_data`
+
+    Returns:
+        List of records (or one pa.Table in Arrow mode), stitched back in row order
+    """
+    total = await get_table_count_async(client, table_name, filters)
+    shards = plan_row_shards(total, page_size)
+
+    pages = await asyncio.gather(*[
+        fetch_range_async(client, table_name, filters, start, end, format, arrow, end - start + 1, columns)
+        for start, end in shards
+    ])
+
+    if not pages:
+        return _decode_response_empty(table_name, format, arrow, columns)
+    return _concat_pages(pages)
+
+
+def fetch_table(table_name, filters=None, page_size=PAGE_SIZE, format='JSON', arrow=False, columns=None):
+    """Synchronous entry point for `fetch_table_async`."""
+    result = fetch_tables(
+        [{'table_name': table_name, 'filters': filters, 'page_size': page_size, 'format': format, 'arrow': arrow,
+          'columns': columns}],
+    )
+    return result[0]
+
+
+def fetch_tables(requests, on_result=None):
+    """
+    Fetch many whole (filtered) tables concurrently within one shared rate budget.
+
+    Args:
+        requests: List of dicts of `fetch_table_async` keyword arguments
+            (table_name, filters, page_size, format, arrow, columns)
+        on_result: Optional callback `on_result(index, result)`, as in `fetch_many_async`
+
+    Returns:
+        List of results, in the same order as `requests`
+    """
+    return asyncio.run(_gather_requests(fetch_table_async, requests, on_result))
 
 
-def get_tri_facilities(state=None, start_row=0, end_row=10000):
+def get_tri_facilities(state=None, start_row=0, end_row=10000, columns=None):
     """
     Get Toxics Release Inventory facilities.
 
@@ -70,6 +848,7 @@ def get_tri_facilities(state=None, start_row=0, end_row=10000):
         state: Optional state abbreviation filter
         start_row: Starting row
         end_row: Ending row
+        columns: Optional list of columns to keep (see `get_table_data`)
 
     Returns:
         List of facility records
@@ -78,7 +857,7 @@ def get_tri_facilities(state=None, start_row=0, end_row=10000):
     if state:
         filters['state_abbr'] = state
 
-    return get_table_data('tri_facility', filters, start_row, end_row)
+    return get_table_data('tri_facility', filters, start_row, end_row, columns=columns)
 
 
 def get_air_facilities(state=None, start_row=0, end_row=10000):
@@ -100,7 +879,7 @@ def get_air_facilities(state=None, start_row=0, end_row=10000):
     return get_table_data('icis_air_fac', filters, start_row, end_row)
 
 
-def get_ghg_emissions_by_gas(year=None, state=None, start_row=0, end_row=10000):
+def get_ghg_emissions_by_gas(year=None, state=None, start_row=0, end_row=10000, columns=None):
     """
     Get greenhouse gas emissions by gas type from GHGRP.
 
@@ -112,6 +891,7 @@ def get_ghg_emissions_by_gas(year=None, state=None, start_row=0, end_row=10000):
         state: Optional state abbreviation filter
         start_row: Starting row
         end_row: Ending row
+        columns: Optional list of columns to keep (see `get_table_data`)
 
     Returns:
         List of emission records with facility info, gas type, and co2e_emission
@@ -122,10 +902,10 @@ def get_ghg_emissions_by_gas(year=None, state=None, start_row=0, end_row=10000):
     if state:
         filters['state'] = state
 
-    return get_table_data('ghg_emitter_gas', filters, start_row, end_row)
+    return get_table_data('ghg_emitter_gas', filters, start_row, end_row, columns=columns)
 
 
-def get_ghg_emissions_by_sector(year=None, state=None, start_row=0, end_row=10000):
+def get_ghg_emissions_by_sector(year=None, state=None, start_row=0, end_row=10000, columns=None):
     """
     Get greenhouse gas emissions by sector from GHGRP.
 
@@ -137,6 +917,7 @@ def get_ghg_emissions_by_sector(year=None, state=None, start_row=0, end_row=1000
         state: Optional state abbreviation filter
         start_row: Starting row
         end_row: Ending row
+        columns: Optional list of columns to keep (see `get_table_data`)
 
     Returns:
         List of emission records with facility info, sector, gas type, and co2e_emission
@@ -147,4 +928,4 @@ def get_ghg_emissions_by_sector(year=None, state=None, start_row=0, end_row=1000
     if state:
         filters['state'] = state
 
-    return get_table_data('ghg_emitter_sector', filters, start_row, end_row)
+    return get_table_data('ghg_emitter_sector', filters, start_row, end_row, columns=columns)
@@ -0,0 +1,29 @@
+"""Ingest EPA Toxics Release Inventory reporting forms (annual filings)."""
+
+import pyarrow as pa
+from crawler import crawl
+
+# ~3.2M filings, 1987-2023; a reporting year is at most ~100K rows
+SPEC = {
+    "table": "tri_reporting_form",
+    "asset_id": "tri_reporting_form",
+    "shard_by": {
+        "reporting_year": list(range(1987, 2024)),
+    },
+    "page_size": 10000,
+    "schema": pa.schema([
+        ('doc_ctrl_num', pa.string()),
+        ('tri_facility_id', pa.string()),
+        ('reporting_year', pa.int64()),
+        ('tri_chem_id', pa.string()),
+        ('form_type_ind', pa.string()),
+        ('one_time_release_qty', pa.float64()),
+        ('production_ratio', pa.float64()),
+        ('max_amount_of_chem', pa.string()),
+    ]),
+}
+
+
+def run():
+    """Crawl all TRI reporting forms into partitioned raw Parquet."""
+    crawl(SPEC)
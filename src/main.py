@@ -8,10 +8,12 @@ import os
 
 os.environ['RUN_ID'] = os.getenv('RUN_ID', 'local-run')
 
-from subsets_utils import validate_environment
+from subsets_utils import validate_environment, debug
 from ingest import tri_facilities as ingest_tri
 from ingest import ghg_emissions as ingest_ghg
 from ingest import ghg_emissions_by_sector as ingest_ghg_sector
+from ingest import tri_reporting_form as ingest_tri_forms
+from ingest import br_reporting as ingest_br
 from transforms import ghg_emissions as transform_ghg
 
 
@@ -23,6 +25,13 @@ def main():
 
     validate_environment()
 
+    try:
+        run_phases(args)
+    finally:
+        debug.print_http_summary()
+
+
+def run_phases(args):
     should_ingest = not args.transform_only
     should_transform = not args.ingest_only
 
@@ -34,6 +43,10 @@ def main():
         ingest_ghg.run()
         print("\nProcessing EPA GHG emissions by sector...")
         ingest_ghg_sector.run()
+        print("\nProcessing EPA TRI reporting forms...")
+        ingest_tri_forms.run()
+        print("\nProcessing EPA Biennial Report...")
+        ingest_br.run()
 
     if should_transform:
         print("\n=== Phase 2: Transform ===")
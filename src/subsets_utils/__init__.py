@@ -1,15 +1,23 @@
-from .http_client import get, post, put, delete
-from .io import upload_data, load_state, save_state, load_asset, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet
+from .http_client import get, post, put, delete, async_get, async_post, async_request, create_async_client, send_streaming, async_send_streaming, iter_json_array, aiter_json_array, get_client, configure_http, retry_policy, RetryPolicy, CircuitOpenError
+from .io import upload_data, load_state, save_state, load_asset, has_changed, table_fingerprint, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet, open_raw_writer, iter_raw_batches, iter_raw_records, load_raw_manifest
+from .rate_limit import shared_rate_limit, set_rate_coordinator, RateCoordinator, FileCoordinator, LocalCoordinator, SharedRateLimit
+from .maintenance import maintain_table, maintain_all
 from .environment import validate_environment, get_data_dir
 from .publish import publish
 from .testing import validate
 from . import debug
 
 __all__ = [
-    'get', 'post', 'put', 'delete',
-    'upload_data', 'load_state', 'save_state', 'load_asset', 'has_changed',
+    'get', 'post', 'put', 'delete', 'async_get', 'async_post', 'async_request', 'create_async_client',
+    'send_streaming', 'async_send_streaming', 'iter_json_array', 'aiter_json_array',
+    'get_client', 'configure_http', 'retry_policy', 'RetryPolicy', 'CircuitOpenError',
+    'upload_data', 'load_state', 'save_state', 'load_asset', 'has_changed', 'table_fingerprint',
     'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file',
     'save_raw_parquet', 'load_raw_parquet',
+    'open_raw_writer', 'iter_raw_batches', 'iter_raw_records', 'load_raw_manifest',
+    'shared_rate_limit', 'set_rate_coordinator', 'RateCoordinator', 'FileCoordinator', 'LocalCoordinator',
+    'SharedRateLimit',
+    'maintain_table', 'maintain_all',
     'validate_environment', 'get_data_dir',
     'publish',
     'validate',
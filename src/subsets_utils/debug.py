@@ -1,5 +1,9 @@
 import os
+import re
 import csv
+import time
+import threading
+from urllib.parse import urlsplit
 from datetime import datetime
 from pathlib import Path
 
@@ -8,6 +12,10 @@ from .r2 import is_cloud_mode
 _log_dir = None
 _run_timestamp = None
 
+# Per-endpoint request metrics for `print_http_summary`, collected whether or not logging is enabled
+_http_stats = {}
+_http_stats_lock = threading.Lock()
+
 
 def _get_run_timestamp() -> str:
     global _run_timestamp
@@ -52,7 +60,47 @@ def _append_csv(filename: str, row: dict, fieldnames: list):
         writer.writerow(row)
 
 
-def log_http_request(method, url, status_code, duration_ms=None, error=None, **kwargs):
+def _endpoint(url):
+    """Group URLs by endpoint: host + path with ids, row ranges and filter values as '*'."""
+    parts = urlsplit(str(url))
+    segments = parts.path.split("/")
+    normalized = []
+    for i, segment in enumerate(segments):
+        if (i > 0 and segments[i - 1] == "=") or re.fullmatch(r"\d+(:\d+)?", segment):
+            normalized.append("*")
+        else:
+            normalized.append(segment)
+    return parts.netloc + "/".join(normalized)
+
+
+def _record_http_stats(url, status_code, duration_ms, ttfb_ms, response_bytes, cache, error, started_at):
+    now = time.time()
+    if started_at is None:
+        started_at = now - (duration_ms or 0) / 1000
+    with _http_stats_lock:
+        stats = _http_stats.setdefault(_endpoint(url), {
+            "requests": 0, "errors": 0, "cache_hits": 0, "bytes": 0, "durations": [], "ttfbs": [],
+            "first": started_at, "last": now,
+        })
+        # Active period: first request started -> last request finished
+        stats["first"] = min(stats["first"], started_at)
+        stats["last"] = max(stats["last"], now)
+        stats["requests"] += 1
+        if error or (status_code or 0) >= 400:
+            stats["errors"] += 1
+        if cache == "hit":
+            stats["cache_hits"] += 1
+        stats["bytes"] += response_bytes or 0
+        if duration_ms is not None:
+            stats["durations"].append(duration_ms)
+        if ttfb_ms is not None:
+            stats["ttfbs"].append(ttfb_ms)
+
+
+def log_http_request(method, url, status_code, duration_ms=None, error=None, connect_ms=None, tls_ms=None,
+                     ttfb_ms=None, download_ms=None, request_bytes=None, response_bytes=None, cache=None,
+                     started_at=None, **kwargs):
+    _record_http_stats(url, status_code, duration_ms, ttfb_ms, response_bytes, cache, error, started_at)
     _append_csv("http_requests.csv", {
         "timestamp": datetime.now().isoformat(),
         "run_id": os.environ.get('RUN_ID', 'unknown'),
@@ -60,8 +108,91 @@ def log_http_request(method, url, status_code, duration_ms=None, error=None, **k
         "url": url,
         "status": status_code,
         "duration_ms": duration_ms,
+        "connect_ms": connect_ms,
+        "tls_ms": tls_ms,
+        "ttfb_ms": ttfb_ms,
+        "download_ms": download_ms,
+        "request_bytes": request_bytes,
+        "response_bytes": response_bytes,
+        "cache": cache or "",
         "error": error or ""
-    }, ["timestamp", "run_id", "method", "url", "status", "duration_ms", "error"])
+    }, ["timestamp", "run_id", "method", "url", "status", "duration_ms", "connect_ms", "tls_ms", "ttfb_ms",
+        "download_ms", "request_bytes", "response_bytes", "cache", "error"])
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def http_summary():
+    """Per-endpoint request counts, latency/TTFB percentiles (ms) and throughput for this run."""
+    with _http_stats_lock:
+        snapshot = {endpoint: dict(stats) for endpoint, stats in _http_stats.items()}
+
+    summary = []
+    for endpoint, stats in sorted(snapshot.items(), key=lambda item: -item[1]["requests"]):
+        durations = stats["durations"]
+        network_seconds = sum(durations) / 1000
+        wall_seconds = stats["last"] - stats["first"]
+        mb = stats["bytes"] / 1024 / 1024
+        summary.append({
+            "endpoint": endpoint,
+            "requests": stats["requests"],
+            "errors": stats["errors"],
+            "cache_hits": stats["cache_hits"],
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+            "p99_ms": _percentile(durations, 99),
+            "ttfb_p50_ms": _percentile(stats["ttfbs"], 50),
+            "ttfb_p95_ms": _percentile(stats["ttfbs"], 95),
+            "mb": round(mb, 2),
+            # Aggregate throughput over the endpoint's active period, and per request while in flight
+            # (not meaningful for a single request or an instantaneous period)
+            "mb_per_s": round(mb / wall_seconds, 2) if stats["requests"] > 1 and wall_seconds > 0.001 else None,
+            "mb_per_s_per_request": round(mb / network_seconds, 2) if network_seconds else None,
+        })
+    return summary
+
+
+def _format_rate(mb_per_s):
+    return "n/a" if mb_per_s is None else f"{mb_per_s} MB/s"
+
+
+def print_http_summary():
+    """Print the per-endpoint HTTP summary and, with logging enabled, write http_summary.csv."""
+    summary = http_summary()
+    if not summary:
+        return
+
+    print("\n=== HTTP summary ===")
+    for row in summary:
+        print(f"  {row['endpoint']}")
+        print(f"    {row['requests']:,} requests, {row['errors']:,} errors, {row['cache_hits']:,} cache hits, "
+              f"{row['mb']:,} MB ({_format_rate(row['mb_per_s'])} overall, "
+              f"{_format_rate(row['mb_per_s_per_request'])} per request)")
+        print(f"    latency p50/p95/p99: {row['p50_ms']}/{row['p95_ms']}/{row['p99_ms']} ms, "
+              f"TTFB p50/p95: {row['ttfb_p50_ms']}/{row['ttfb_p95_ms']} ms")
+
+    fieldnames = list(summary[0].keys())
+    for row in summary:
+        _append_csv("http_summary.csv", {"run_id": os.environ.get('RUN_ID', 'unknown'), **row}, ["run_id"] + fieldnames)
+
+
+def log_rate_control(event, rate, concurrency, in_flight, successes=None, failures=None, **kwargs):
+    _append_csv("rate_control.csv", {
+        "timestamp": datetime.now().isoformat(),
+        "run_id": os.environ.get('RUN_ID', 'unknown'),
+        "event": event,
+        "rate": rate,
+        "concurrency": concurrency,
+        "in_flight": in_flight,
+        "successes": successes,
+        "failures": failures
+    }, ["timestamp", "run_id", "event", "rate", "concurrency", "in_flight", "successes", "failures"])
 
 
 def log_data_output(dataset_name, row_count, size_bytes, columns=None, null_counts=None, **kwargs):
@@ -76,6 +207,23 @@ def log_data_output(dataset_name, row_count, size_bytes, columns=None, null_coun
     }, ["timestamp", "run_id", "dataset", "rows", "size_bytes", "columns", "null_counts"])
 
 
+def log_table_maintenance(dataset, files_before, files_after, files_added=0, files_removed=0, files_vacuumed=0,
+                          open_seconds_before=None, open_seconds_after=None, **kwargs):
+    _append_csv("table_maintenance.csv", {
+        "timestamp": datetime.now().isoformat(),
+        "run_id": os.environ.get('RUN_ID', 'unknown'),
+        "dataset": dataset,
+        "files_before": files_before,
+        "files_after": files_after,
+        "files_added": files_added,
+        "files_removed": files_removed,
+        "files_vacuumed": files_vacuumed,
+        "open_seconds_before": open_seconds_before,
+        "open_seconds_after": open_seconds_after
+    }, ["timestamp", "run_id", "dataset", "files_before", "files_after", "files_added", "files_removed",
+        "files_vacuumed", "open_seconds_before", "open_seconds_after"])
+
+
 def log_run_start():
     # Detect environment (cloud vs local)
     environment = "cloud" if is_cloud_mode() else "local"
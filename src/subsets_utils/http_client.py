@@ -1,156 +1,1331 @@
 import os
+import gzip
+import asyncio
+import tempfile
 import json
+import base64
+import codecs
+import random
+import sqlite3
 import hashlib
+import threading
 import httpx
 import time
 from pathlib import Path
-from typing import Optional, Dict, Union
+from typing import Optional, Dict, Union, Callable, Iterable, Iterator, AsyncIterable, AsyncIterator
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from tenacity import Retrying, AsyncRetrying, stop_after_attempt
 from . import debug
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 _client = None
+_cache_manager = None
+_client_lock = threading.RLock()
 _client_config = {
     'timeout': int(os.environ.get('HTTP_TIMEOUT', '30')),
+    'max_connections': int(os.environ.get('HTTP_MAX_CONNECTIONS', '20')),
+    'max_keepalive_connections': int(os.environ.get('HTTP_MAX_KEEPALIVE', '10')),
+    'keepalive_expiry': float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '30')),
+    'http2': os.environ.get('HTTP_HTTP2', '').lower() == 'true',
     'cache_enabled': os.environ.get('ENABLE_HTTP_CACHE', '').lower() == 'true',
+    'record_dir': os.environ.get('HTTP_RECORD_DIR') or None,
     'cache_dir': Path(os.environ.get('HTTP_CACHE_DIR', 'http_cache')),
+    'cache_backend': os.environ.get('HTTP_CACHE_BACKEND', 'sqlite'),
+    'cache_ttl': float(os.environ.get('HTTP_CACHE_TTL', '86400')),
+    'cache_max_bytes': int(os.environ.get('HTTP_CACHE_MAX_BYTES', str(2 * 1024 ** 3))),
+    'cache_compression': os.environ.get('HTTP_CACHE_COMPRESSION', 'zstd' if zstandard else 'gzip'),
     'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')}
 }
 
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Requests to a host are paused because it kept failing."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures a host's circuit opens and
+    requests fail fast with CircuitOpenError for `reset_timeout` seconds.
+    Then a single probe request is let through: success closes the circuit,
+    failure re-opens it. Callers arriving while the probe is in flight wait
+    for its outcome instead of failing.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, host: str) -> dict:
+        return self._hosts.setdefault(host, {"failures": 0, "opened_at": None, "probe": None})
+
+    def _check(self, host: str):
+        """Returns (is_probe, probe_event); the event is set when someone else's probe finishes."""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry["opened_at"] is None:
+                return False, None
+            if entry["probe"] is not None:
+                return False, entry["probe"]
+            remaining = entry["opened_at"] + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(host, remaining)
+            entry["probe"] = threading.Event()
+            return True, None
+
+    def check(self, host: str) -> bool:
+        """Raise CircuitOpenError if `host` is open; returns True if the caller is the probe.
+
+        Blocks while another caller's probe is in flight.
+        """
+        while True:
+            is_probe, probe = self._check(host)
+            if probe is None:
+                return is_probe
+            probe.wait()
+
+    async def check_async(self, host: str) -> bool:
+        """`check` for event-loop callers: waits for an in-flight probe without blocking the loop."""
+        while True:
+            is_probe, probe = self._check(host)
+            if probe is None:
+                return is_probe
+            while not probe.is_set():
+                await asyncio.sleep(0.1)
+
+    def end_probe(self, host: str):
+        """Release waiters if a probe ended without `record` (e.g. it was cancelled)."""
+        with self._lock:
+            entry = self._entry(host)
+            if entry["probe"] is not None:
+                entry["probe"].set()
+                entry["probe"] = None
+
+    def record(self, host: str, ok: bool):
+        with self._lock:
+            entry = self._entry(host)
+            if entry["probe"] is not None:
+                entry["probe"].set()
+                entry["probe"] = None
+            if ok:
+                entry["failures"] = 0
+                entry["opened_at"] = None
+                return
+            entry["failures"] += 1
+            if entry["failures"] >= self.failure_threshold:
+                if entry["opened_at"] is None:
+                    print(f"      Circuit opened for {host} after {entry['failures']} consecutive failures")
+                entry["opened_at"] = time.monotonic()
+
+
+class RetryBudget:
+    """Caps the total number of retries in one run, across all callers."""
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self.spent >= self.max_retries:
+                return False
+            self.spent += 1
+            if self.spent == self.max_retries:
+                print(f"      Retry budget of {self.max_retries} exhausted, no further retries this run")
+            return True
+
+
+class RetryPolicy:
+    """Shared retry policy for sync and async HTTP callers.
+
+    Retries transport errors (connect/read timeouts, dropped connections),
+    CircuitOpenError and RETRY_STATUSES responses, waiting with decorrelated
+    jitter (so parallel workers don't retry in lockstep) or the server's
+    Retry-After, whichever is longer. Retries are drawn from a per-run
+    RetryBudget and failures feed a per-host CircuitBreaker.
+
+    When attempts run out, the last response is returned (callers decide
+    via raise_for_status) or the last exception re-raised.
+
+    Usage:
+        response = policy.call(url, lambda: client.get(url))
+        response = await policy.call_async(url, lambda: async_client.get(url))
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 max_retry_after: float = 300.0, retry_statuses: tuple = RETRY_STATUSES,
+                 budget: RetryBudget = None, breaker: CircuitBreaker = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+        self.budget = budget or RetryBudget(int(os.environ.get('HTTP_RETRY_BUDGET', '500')))
+        self.breaker = breaker or CircuitBreaker()
+
+    def _is_retryable_error(self, error: BaseException) -> bool:
+        return isinstance(error, (httpx.TransportError, CircuitOpenError))
+
+    def _is_failure(self, retry_state) -> bool:
+        if retry_state.outcome.failed:
+            return self._is_retryable_error(retry_state.outcome.exception())
+        return retry_state.outcome.result().status_code in self.retry_statuses
+
+    def _budget_spent(self, retry_state) -> bool:
+        # Part of `stop`, which tenacity only consults once a retry is wanted and
+        # after the attempt limit, so only retries that actually happen are charged
+        return not self.budget.spend()
+
+    def _retry_after(self, retry_state) -> Optional[float]:
+        if retry_state.outcome.failed:
+            error = retry_state.outcome.exception()
+            return error.retry_in if isinstance(error, CircuitOpenError) else None
+
+        value = retry_state.outcome.result().headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return (when - datetime.now(when.tzinfo)).total_seconds()
+
+    def _wait(self, retry_state) -> float:
+        # Decorrelated jitter: sleep = min(cap, uniform(base, previous_sleep * 3))
+        previous = getattr(retry_state, "previous_sleep", self.base_delay)
+        sleep = min(self.max_delay, random.uniform(self.base_delay, previous * 3))
+        retry_state.previous_sleep = sleep
+
+        retry_after = self._retry_after(retry_state)
+        if retry_after is not None:
+            sleep = max(sleep, min(retry_after, self.max_retry_after))
+        return sleep
+
+    def _before_sleep(self, retry_state):
+        if retry_state.outcome.failed:
+            reason = type(retry_state.outcome.exception()).__name__
+        else:
+            reason = f"HTTP {retry_state.outcome.result().status_code}"
+        print(f"      {reason}, retrying in {retry_state.next_action.sleep:.1f}s "
+              f"(attempt {retry_state.attempt_number + 1}/{self.max_attempts})...")
+
+    def _give_up(self, retry_state):
+        # Out of attempts: hand back the last response, or re-raise the last error
+        return retry_state.outcome.result()
+
+    def _retrying_kwargs(self) -> dict:
+        return {
+            "stop": stop_after_attempt(self.max_attempts) | self._budget_spent,
+            "wait": self._wait,
+            "retry": self._is_failure,
+            "before_sleep": self._before_sleep,
+            "retry_error_callback": self._give_up,
+        }
+
+    def _record(self, host: str, response: httpx.Response = None, error: BaseException = None):
+        if isinstance(error, CircuitOpenError):
+            return
+        if error is not None:
+            self.breaker.record(host, not self._is_retryable_error(error))
+        else:
+            self.breaker.record(host, response.status_code not in self.retry_statuses)
+
+    def call(self, url: str, send: Callable[[], httpx.Response]) -> httpx.Response:
+        host = httpx.URL(url).host
+
+        def attempt():
+            is_probe = self.breaker.check(host)
+            try:
+                try:
+                    response = send()
+                except Exception as e:
+                    self._record(host, error=e)
+                    raise
+                self._record(host, response=response)
+                return response
+            finally:
+                if is_probe:
+                    self.breaker.end_probe(host)
+
+        return Retrying(**self._retrying_kwargs())(attempt)
+
+    async def call_async(self, url: str, send: Callable) -> httpx.Response:
+        host = httpx.URL(url).host
+
+        async def attempt():
+            is_probe = await self.breaker.check_async(host)
+            try:
+                try:
+                    response = await send()
+                except Exception as e:
+                    self._record(host, error=e)
+                    raise
+                self._record(host, response=response)
+                return response
+            finally:
+                if is_probe:
+                    self.breaker.end_probe(host)
+
+        return await AsyncRetrying(**self._retrying_kwargs())(attempt)
+
+
+# One policy per process: the retry budget and circuit state are per run
+retry_policy = RetryPolicy()
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via a temp file in the same directory + rename, so readers never see partial files."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _compress_body(content: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(content)
+    if codec == "gzip":
+        return gzip.compress(content, compresslevel=6)
+    return content
+
+
+def _read_body(path: Path, codec: Optional[str]) -> bytes:
+    """Read a cached body, decompressing as the file is read."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Cache entry is zstd-compressed but zstandard is not installed")
+        with open(path, 'rb') as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            return reader.read()
+    if codec == "gzip":
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _body_codec(codec: str) -> str:
+    """Resolve the configured codec, falling back to gzip when zstandard is missing."""
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec if codec in ("zstd", "gzip") else "none"
+
+
 class CacheManager:
-    def __init__(self, cache_dir: Path):
+    """On-disk response cache: {key}.bin body + {key}.meta.json metadata.
+
+    Entries expire after their TTL (Cache-Control max-age, else the default
+    `ttl`); stale entries that carry an ETag or Last-Modified are revalidated
+    with a conditional request instead of being re-downloaded. The cache is
+    kept under `max_bytes` by evicting least-recently-used entries (a hit
+    bumps the body file's mtime). Bodies are stored compressed (zstd when
+    `zstandard` is installed, else gzip); the codec is recorded per entry.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+                 compression: str = "gzip"):
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(exist_ok=True, parents=True)
-        
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.codec = _body_codec(compression)
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
     def _cache_key(self, method: str, url: str, params: Optional[Dict] = None) -> str:
         key_parts = [method, url]
         if params:
             key_parts.append(json.dumps(sorted(params.items())))
         return hashlib.md5("".join(key_parts).encode()).hexdigest()
-    
-    def get(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+
+    def _paths(self, key: str):
+        return self.cache_dir / f"{key}.meta.json", self.cache_dir / f"{key}.bin"
+
+    def _expires_at(self, response: httpx.Response) -> Optional[float]:
+        """Expiry (epoch seconds) from Cache-Control max-age, else the default TTL."""
+        for directive in response.headers.get("cache-control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name.lower() == "max-age" and value.isdigit():
+                return time.time() + int(value)
+        return time.time() + self.ttl if self.ttl is not None else None
+
+    def lookup(self, method: str, url: str, **kwargs) -> Optional[dict]:
+        """Return {"response", "metadata", "fresh"} for a cached entry, fresh or stale."""
         key = self._cache_key(method, url, kwargs.get("params"))
-        metadata_file = self.cache_dir / f"{key}.meta.json"
-        content_file = self.cache_dir / f"{key}.bin"
-        
-        if metadata_file.exists() and content_file.exists():
-            # Load metadata
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-            
-            # Load raw content bytes
-            with open(content_file, 'rb') as f:
-                content = f.read()
-            
-            # Get headers and remove encoding-related ones since content is raw
-            headers = metadata.get("headers", {})
-            headers.pop("content-encoding", None)
-            headers.pop("transfer-encoding", None)
-
-            return httpx.Response(
-                status_code=metadata["status_code"],
-                headers=headers,
-                content=content,
-                request=httpx.Request(method, url)
-            )
-        
+        metadata_file, content_file = self._paths(key)
+
+        if not (metadata_file.exists() and content_file.exists()):
+            return None
+
+        # Load metadata
+        with open(metadata_file, 'r') as f:
+            metadata = json.load(f)
+
+        # Load content bytes (entries from before compression have no codec)
+        content = _read_body(content_file, metadata.get("body_codec"))
+
+        # Mark as recently used for LRU eviction
+        os.utime(content_file)
+
+        # Get headers and remove encoding-related ones since content is raw
+        headers = metadata.get("headers", {})
+        headers.pop("content-encoding", None)
+        headers.pop("transfer-encoding", None)
+
+        response = httpx.Response(
+            status_code=metadata["status_code"],
+            headers=headers,
+            content=content,
+            request=httpx.Request(method, url)
+        )
+        expires_at = metadata.get("expires_at")
+        fresh = expires_at is None or time.time() < expires_at
+        return {"response": response, "metadata": metadata, "fresh": fresh}
+
+    def get(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Return the cached response if present and not expired."""
+        entry = self.lookup(method, url, **kwargs)
+        if entry and entry["fresh"]:
+            return entry["response"]
         return None
-    
+
     def save(self, method: str, url: str, response: httpx.Response, **kwargs):
+        if "no-store" in response.headers.get("cache-control", ""):
+            return
+
         key = self._cache_key(method, url, kwargs.get("params"))
-        metadata_file = self.cache_dir / f"{key}.meta.json"
-        content_file = self.cache_dir / f"{key}.bin"
-        
-        # Save raw content bytes
-        with open(content_file, 'wb') as f:
-            f.write(response.content)
-        
+        metadata_file, content_file = self._paths(key)
+        previous_size = content_file.stat().st_size if content_file.exists() else 0
+
+        # Save compressed content bytes (body first, so metadata never points at a missing body)
+        body = _compress_body(response.content, self.codec)
+        _atomic_write(content_file, body)
+
         # Save metadata
         metadata = {
             "status_code": response.status_code,
             "headers": dict(response.headers),
             "url": url,
             "method": method,
-            "cached_at": datetime.now().isoformat()
+            "cached_at": datetime.now().isoformat(),
+            "expires_at": self._expires_at(response),
+            "body_codec": self.codec,
         }
-        
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+
+        _atomic_write(metadata_file, json.dumps(metadata, indent=2).encode('utf-8'))
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(body) - previous_size
+        self._evict_if_needed()
+
+    def refresh(self, method: str, url: str, not_modified: httpx.Response, **kwargs):
+        """Extend a revalidated entry after a 304, merging the new headers."""
+        key = self._cache_key(method, url, kwargs.get("params"))
+        metadata_file, _ = self._paths(key)
+
+        with open(metadata_file, 'r') as f:
+            metadata = json.load(f)
+
+        metadata["headers"].update(dict(not_modified.headers))
+        metadata["expires_at"] = self._expires_at(not_modified)
+        metadata["revalidated_at"] = datetime.now().isoformat()
+
+        _atomic_write(metadata_file, json.dumps(metadata, indent=2).encode('utf-8'))
+
+    def _evict_if_needed(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        if not self.max_bytes:
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.bin"))
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            # Evict down to 90% so we don't rescan on every save
+            target = self.max_bytes * 0.9
+            bodies = sorted(self.cache_dir.glob("*.bin"), key=lambda p: p.stat().st_mtime)
+            evicted = 0
+            for content_file in bodies:
+                if self._total_bytes <= target:
+                    break
+                try:
+                    size = content_file.stat().st_size
+                except FileNotFoundError:
+                    continue
+                content_file.unlink(missing_ok=True)
+                self.cache_dir.joinpath(content_file.stem + ".meta.json").unlink(missing_ok=True)
+                self._total_bytes -= size
+                evicted += 1
+
+        print(f"  HTTP cache: evicted {evicted} entries to stay under {self.max_bytes / 1024 / 1024:.0f} MB")
+
+
+class SQLiteCacheManager(CacheManager):
+    """Response cache with an embedded SQLite index and content-addressed bodies.
+
+    Metadata for every entry lives in one index.sqlite (a single indexed
+    lookup per request, cheap LRU queries for eviction); bodies live once
+    per sha256 under blobs/ab/abcdef..., so identical bodies served under
+    different URLs are stored once. Expiry, revalidation and the byte budget
+    behave as in CacheManager. Hit/miss counts are available from `stats()`.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+                 compression: str = "gzip"):
+        super().__init__(cache_dir, ttl, max_bytes, compression)
+        self.blob_dir = cache_dir / "blobs"
+        self._db = sqlite3.connect(str(cache_dir / "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                method TEXT,
+                url TEXT,
+                status_code INTEGER,
+                headers TEXT,
+                body_hash TEXT,
+                size INTEGER,
+                cached_at REAL,
+                expires_at REAL,
+                last_access REAL,
+                codec TEXT
+            )
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "codec" not in columns:
+            self._db.execute("ALTER TABLE entries ADD COLUMN codec TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_body_hash ON entries (body_hash)")
+        self._db.commit()
+        self._stats = {"hits": 0, "stale": 0, "misses": 0, "revalidated": 0, "saves": 0, "deduplicated": 0, "evictions": 0}
+        # Running total of distinct blob bytes, so saves never re-scan the index
+        self._total_bytes = self._stored_bytes()
+
+    def _blob_path(self, body_hash: str, codec: Optional[str] = None) -> Path:
+        suffix = {"zstd": ".zst", "gzip": ".gz"}.get(codec, "")
+        return self.blob_dir / body_hash[:2] / f"{body_hash}{suffix}"
+
+    def lookup(self, method: str, url: str, **kwargs) -> Optional[dict]:
+        key = self._cache_key(method, url, kwargs.get("params"))
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status_code, headers, body_hash, expires_at, codec FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        status_code, headers_json, body_hash, expires_at, codec = row
+        blob = self._blob_path(body_hash, codec)
+        if not blob.exists():
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        content = _read_body(blob, codec)
+
+        metadata = {"status_code": status_code, "headers": json.loads(headers_json), "expires_at": expires_at}
+        headers = dict(metadata["headers"])
+        headers.pop("content-encoding", None)
+        headers.pop("transfer-encoding", None)
+
+        fresh = expires_at is None or time.time() < expires_at
+        with self._lock:
+            self._stats["hits" if fresh else "stale"] += 1
+
+        response = httpx.Response(
+            status_code=status_code,
+            headers=headers,
+            content=content,
+            request=httpx.Request(method, url)
+        )
+        return {"response": response, "metadata": metadata, "fresh": fresh}
+
+    def save(self, method: str, url: str, response: httpx.Response, **kwargs):
+        if "no-store" in response.headers.get("cache-control", ""):
+            return
+
+        key = self._cache_key(method, url, kwargs.get("params"))
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()
+        blob = self._blob_path(body_hash, self.codec)
+
+        if blob.exists():
+            deduplicated = True
+            size = blob.stat().st_size
+        else:
+            deduplicated = False
+            body = _compress_body(content, self.codec)
+            size = len(body)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(blob, body)
+
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT body_hash, codec, size FROM entries WHERE key = ?", (key,)).fetchone()
+            if not self._blob_in_use(body_hash, self.codec):
+                self._total_bytes += size
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, method, url, response.status_code, json.dumps(dict(response.headers)),
+                 body_hash, size, now, self._expires_at(response), now, self.codec)
+            )
+            self._db.commit()
+            self._stats["saves"] += 1
+            if deduplicated:
+                self._stats["deduplicated"] += 1
+            if previous and (previous[0], previous[1]) != (body_hash, self.codec):
+                self._drop_blob_if_unused(*previous)
+
+        self._evict_if_needed()
+
+    def refresh(self, method: str, url: str, not_modified: httpx.Response, **kwargs):
+        key = self._cache_key(method, url, kwargs.get("params"))
+
+        with self._lock:
+            row = self._db.execute("SELECT headers FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            headers = json.loads(row[0])
+            headers.update(dict(not_modified.headers))
+            self._db.execute(
+                "UPDATE entries SET headers = ?, expires_at = ? WHERE key = ?",
+                (json.dumps(headers), self._expires_at(not_modified), key)
+            )
+            self._db.commit()
+            self._stats["revalidated"] += 1
+
+    def _blob_in_use(self, body_hash: str, codec: Optional[str]) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM entries WHERE body_hash = ? AND codec IS ? LIMIT 1", (body_hash, codec)
+        ).fetchone() is not None
+
+    def _drop_blob_if_unused(self, body_hash: str, codec: Optional[str], size: int) -> int:
+        """Delete a blob no entry points at any more (caller holds the lock); returns bytes freed."""
+        if self._blob_in_use(body_hash, codec):
+            return 0
+        self._total_bytes -= size
+        self._blob_path(body_hash, codec).unlink(missing_ok=True)
+        return size
+
+    def _stored_bytes(self) -> int:
+        """Full scan of distinct blob sizes; only used to seed `_total_bytes` at open."""
+        row = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, codec, size FROM entries)"
+        ).fetchone()
+        return row[0]
+
+    def _evict_if_needed(self):
+        if not self.max_bytes:
+            return
+
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            # Evict down to 90% so we don't re-evict on every save
+            target = self.max_bytes * 0.9
+            evicted = 0
+            rows = self._db.execute("SELECT key, body_hash, codec, size FROM entries ORDER BY last_access")
+            for key, body_hash, codec, size in rows.fetchall():
+                if self._total_bytes <= target:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._drop_blob_if_unused(body_hash, codec, size)
+                evicted += 1
+            self._db.commit()
+            self._stats["evictions"] += evicted
+
+        print(f"  HTTP cache: evicted {evicted} entries to stay under {self.max_bytes / 1024 / 1024:.0f} MB")
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this run plus entry count and stored bytes."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {**self._stats, "entries": entries, "stored_bytes": self._total_bytes}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _conditional_headers(metadata: dict) -> dict:
+    """If-None-Match / If-Modified-Since headers from a cached entry's validators."""
+    cached_headers = metadata.get("headers", {})
+    headers = {}
+    if cached_headers.get("etag"):
+        headers["If-None-Match"] = cached_headers["etag"]
+    if cached_headers.get("last-modified"):
+        headers["If-Modified-Since"] = cached_headers["last-modified"]
+    return headers
+
+
+def _prepare_cached_request(cache: CacheManager, entry: Optional[dict], kwargs: dict):
+    """Add conditional headers for a stale entry; returns (request_kwargs, validators)."""
+    validators = _conditional_headers(entry["metadata"]) if entry else {}
+    if not validators:
+        return kwargs, validators
+    return {**kwargs, "headers": {**(kwargs.get("headers") or {}), **validators}}, validators
+
+
+# Only idempotent reads are coalesced; two POSTs to the same URL are two requests
+COALESCED_METHODS = ("GET", "HEAD")
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls across threads: one runs, the rest wait for its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+
+# Handed to followers when the leader's task is cancelled, so they retry instead of re-raising it
+_LEADER_CANCELLED = object()
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight, for callers sharing one event loop."""
+
+    def __init__(self):
+        self._calls = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable):
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            # shield: a cancelled follower must not cancel the leader's request
+            result = await asyncio.shield(future)
+            if result is not _LEADER_CANCELLED:
+                return result
+            # The leader was cancelled, not failed: the first follower back takes over
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
 
 
 class CachedClient:
     def __init__(self, client: httpx.Client, cache_manager: CacheManager):
         self.client = client
         self.cache = cache_manager
-        
+        self._inflight = SingleFlight()
+
     def request(self, method: str, url: str, **kwargs) -> httpx.Response:
-        if _client_config['cache_enabled']:
-            cached_response = self.cache.get(method, url, **kwargs)
-            if cached_response:
-                return cached_response
+        if not _client_config['cache_enabled']:
+            return self.client.request(method, url, **kwargs)
+
+        if method.upper() in COALESCED_METHODS:
+            key = self.cache._cache_key(method, url, kwargs.get("params"))
+            return self._inflight.do(key, lambda: self._cached_request(method, url, **kwargs))
+        return self._cached_request(method, url, **kwargs)
+
+    def _cached_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        entry = self.cache.lookup(method, url, **kwargs)
+        if entry and entry["fresh"]:
+            entry["response"].extensions["cache"] = "hit"
+            return entry["response"]
 
-        response = self.client.request(method, url, **kwargs)
+        # Stale entry with validators: ask the server whether it changed
+        request_kwargs, validators = _prepare_cached_request(self.cache, entry, kwargs)
+        response = self.client.request(method, url, **request_kwargs)
 
-        if _client_config['cache_enabled'] and response.status_code < 400:
+        if response.status_code == 304 and validators:
+            self.cache.refresh(method, url, response, **kwargs)
+            entry["response"].extensions["cache"] = "revalidated"
+            return entry["response"]
+
+        response.extensions["cache"] = "miss"
+        if response.status_code < 400:
             self.cache.save(method, url, response, **kwargs)
 
         return response
-    
+
     def get(self, url: str, **kwargs) -> httpx.Response:
         return self.request("GET", url, **kwargs)
-    
+
     def post(self, url: str, **kwargs) -> httpx.Response:
         return self.request("POST", url, **kwargs)
-    
+
     def put(self, url: str, **kwargs) -> httpx.Response:
         return self.request("PUT", url, **kwargs)
-    
+
     def delete(self, url: str, **kwargs) -> httpx.Response:
         return self.request("DELETE", url, **kwargs)
-    
+
     def close(self):
+        # The cache manager is shared with async clients and closed by configure_http
         self.client.close()
 
-def _create_base_client() -> httpx.Client:
-    return httpx.Client(
-        timeout=_client_config['timeout'],
-        headers=_client_config['headers'],
-        follow_redirects=True
-    )
+
+class AsyncCachedClient:
+    """httpx.AsyncClient counterpart of CachedClient, sharing the same cache.
+
+    Cache reads and writes are file/SQLite I/O, so they run in a worker
+    thread to keep the event loop free.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, cache_manager: CacheManager):
+        self.client = client
+        self.cache = cache_manager
+        self._inflight = AsyncSingleFlight()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if not _client_config['cache_enabled']:
+            return await self.client.request(method, url, **kwargs)
+
+        if method.upper() in COALESCED_METHODS:
+            key = self.cache._cache_key(method, url, kwargs.get("params"))
+            return await self._inflight.do(key, lambda: self._cached_request(method, url, **kwargs))
+        return await self._cached_request(method, url, **kwargs)
+
+    async def _cached_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        entry = await asyncio.to_thread(self.cache.lookup, method, url, **kwargs)
+        if entry and entry["fresh"]:
+            entry["response"].extensions["cache"] = "hit"
+            return entry["response"]
+
+        request_kwargs, validators = _prepare_cached_request(self.cache, entry, kwargs)
+        response = await self.client.request(method, url, **request_kwargs)
+
+        if response.status_code == 304 and validators:
+            await asyncio.to_thread(self.cache.refresh, method, url, response, **kwargs)
+            entry["response"].extensions["cache"] = "revalidated"
+            return entry["response"]
+
+        response.extensions["cache"] = "miss"
+        if response.status_code < 400:
+            await asyncio.to_thread(self.cache.save, method, url, response, **kwargs)
+
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+def _use_http2(config: dict) -> bool:
+    if not config['http2']:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("Warning: HTTP_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def _client_kwargs(config: dict) -> dict:
+    """Settings shared by the sync and async clients: pool limits, keep-alive, HTTP/2."""
+    return {
+        'timeout': config['timeout'],
+        'headers': config['headers'],
+        'follow_redirects': True,
+        'http2': _use_http2(config),
+        'limits': httpx.Limits(
+            max_connections=config['max_connections'],
+            max_keepalive_connections=config['max_keepalive_connections'],
+            keepalive_expiry=config['keepalive_expiry'],
+        ),
+    }
+
+
+def _create_base_client(config: dict) -> httpx.Client:
+    return httpx.Client(**_client_kwargs(config))
+
+
+def _get_cache_manager(config: dict) -> CacheManager:
+    global _cache_manager
+
+    with _client_lock:
+        if _cache_manager is None:
+            cache_class = SQLiteCacheManager if config['cache_backend'] == 'sqlite' else CacheManager
+            _cache_manager = cache_class(
+                config['cache_dir'], config['cache_ttl'], config['cache_max_bytes'], config['cache_compression']
+            )
+    return _cache_manager
+
 
 def _get_or_create_client(**overrides) -> Union[httpx.Client, CachedClient]:
     global _client
-    
-    if _client is None:
-        config = _client_config.copy()
-        config.update(overrides)
-        
-        base_client = _create_base_client()
-        
-        if config['cache_enabled']:
-            cache_manager = CacheManager(config['cache_dir'])
-            _client = CachedClient(base_client, cache_manager)
-        else:
-            _client = base_client
-            
+
+    with _client_lock:
+        if _client is None:
+            config = _client_config.copy()
+            config.update(overrides)
+
+            base_client = _create_base_client(config)
+
+            if config['cache_enabled']:
+                _client = CachedClient(base_client, _get_cache_manager(config))
+            else:
+                _client = base_client
+
     return _client
 
-def _logged_request(method: str, url: str, **kwargs) -> httpx.Response:
-    """Execute HTTP request with logging if ENABLE_LOGGING is set."""
+
+def create_async_client(**overrides) -> Union[httpx.AsyncClient, AsyncCachedClient]:
+    """Create an async client with the same settings and cache as the sync one.
+
+    httpx.AsyncClient is bound to the event loop it runs in, so create one
+    per loop (e.g. per asyncio.run) and use it as an async context manager.
+    """
+    config = _client_config.copy()
+    config.update(overrides)
+
+    base_client = httpx.AsyncClient(**_client_kwargs(config))
+    if config['cache_enabled']:
+        return AsyncCachedClient(base_client, _get_cache_manager(config))
+    return base_client
+
+
+RECORDINGS_FILE = "recordings.jsonl"
+_record_lock = threading.Lock()
+
+
+def _record_response(method: str, response: httpx.Response):
+    """Append a response to HTTP_RECORD_DIR/recordings.jsonl (replayable by efservice_stub).
+
+    The body must already be read. Text bodies are stored as-is, binary
+    ones (Parquet) base64-encoded.
+    """
+    record_dir = _client_config['record_dir']
+    if not record_dir or response.status_code >= 400:
+        return
+
+    record = {
+        "method": method,
+        "url": str(response.request.url),
+        "status": response.status_code,
+        "content_type": response.headers.get("content-type", ""),
+        "recorded_at": datetime.now().isoformat(),
+    }
+    try:
+        record["body"] = response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        record["body_base64"] = base64.b64encode(response.content).decode("ascii")
+
+    path = Path(record_dir) / RECORDINGS_FILE
+    with _record_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class RequestTrace:
+    """Phase timings for one request, collected through httpcore's `trace` extension.
+
+    Pass `trace.callback` (sync clients) or `trace.async_callback` (async
+    clients) as `extensions={"trace": ...}`; `metrics()` then splits the
+    request into connect, TLS, time-to-first-byte and body download.
+    Phases that didn't happen (reused connection, cache hit) are None.
+    """
+
+    def __init__(self):
+        self._started = {}
+        self._durations = {}
+
+    def _event(self, event_name: str):
+        # e.g. "connection.connect_tcp.started", "http11.receive_response_body.complete"
+        step, _, state = event_name.partition(".")[2].rpartition(".")
+        now = time.perf_counter()
+        if state == "started":
+            self._started[step] = now
+        elif state in ("complete", "failed") and step in self._started:
+            self._durations[step] = now - self._started[step]
+            if step == "receive_response_headers":
+                self._durations["ttfb"] = now - self._started.get("send_request_headers", self._started[step])
+
+    def callback(self, event_name: str, info: dict):
+        self._event(event_name)
+
+    async def async_callback(self, event_name: str, info: dict):
+        self._event(event_name)
+
+    def metrics(self) -> dict:
+        def ms(step):
+            seconds = self._durations.get(step)
+            return None if seconds is None else int(seconds * 1000)
+
+        return {
+            "connect_ms": ms("connect_tcp"),
+            "tls_ms": ms("start_tls"),
+            "ttfb_ms": ms("ttfb"),
+            "download_ms": ms("receive_response_body"),
+        }
+
+
+def _with_trace(kwargs: dict, callback: Callable) -> dict:
+    return {**kwargs, "extensions": {**(kwargs.get("extensions") or {}), "trace": callback}}
+
+
+def _request_bytes(request: httpx.Request) -> int:
+    size = len(request.method) + len(str(request.url)) + sum(len(k) + len(v) + 4 for k, v in request.headers.raw)
+    try:
+        size += len(request.content)
+    except httpx.RequestNotRead:
+        pass
+    return size
+
+
+def _log_request(method: str, url: str, start: float, response: Optional[httpx.Response],
+                 error: Optional[str], trace: RequestTrace):
+    """Log one request with its phase timings, byte counts and cache status."""
+    details = {}
+    if response is not None:
+        cache = response.extensions.get("cache")
+        details = {
+            "request_bytes": _request_bytes(response.request),
+            # Cache hits cost no network bytes
+            "response_bytes": 0 if cache == "hit" else response.num_bytes_downloaded,
+            "cache": cache,
+        }
+    duration_ms = int((time.time() - start) * 1000)
+    debug.log_http_request(
+        method, url, response.status_code if response is not None else None,
+        duration_ms=duration_ms, error=error, started_at=start, **trace.metrics(), **details,
+    )
+
+
+def _logged_request(method: str, url: str, retry: bool = False, **kwargs) -> httpx.Response:
+    """Execute HTTP request with logging if ENABLE_LOGGING is set.
+
+    With retry=True the request goes through the shared `retry_policy`,
+    and every attempt is logged.
+    """
+    if retry:
+        return retry_policy.call(url, lambda: _logged_request(method, url, **kwargs))
+
     client = _get_or_create_client()
+    trace = RequestTrace()
     start = time.time()
     error = None
-    status = None
+    response = None
 
     try:
-        response = client.request(method, url, **kwargs)
-        status = response.status_code
+        response = client.request(method, url, **_with_trace(kwargs, trace.callback))
+        _record_response(method, response)
         return response
     except Exception as e:
         error = str(e)
         raise
     finally:
-        duration_ms = int((time.time() - start) * 1000)
-        debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
+        _log_request(method, url, start, response, error, trace)
+
+
+async def async_request(client, method: str, url: str, retry: bool = False, **kwargs) -> httpx.Response:
+    """Async counterpart of the logged module-level requests, on a `create_async_client()` client."""
+    if retry:
+        return await retry_policy.call_async(url, lambda: async_request(client, method, url, **kwargs))
+
+    trace = RequestTrace()
+    start = time.time()
+    error = None
+    response = None
+
+    try:
+        response = await client.request(method, url, **_with_trace(kwargs, trace.async_callback))
+        _record_response(method, response)
+        return response
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        _log_request(method, url, start, response, error, trace)
+
+
+def _log_when_closed(response: httpx.Response, log: Callable):
+    """Defer logging a streamed response until its body is closed.
+
+    httpx closes a response once its body is fully iterated, and callers
+    close it when they stop early, so the log then carries the real
+    download time and byte count.
+    """
+    if response.is_closed:
+        log()
+        return
+
+    logged = False
+    close, aclose = response.close, response.aclose
+
+    def log_once():
+        nonlocal logged
+        if not logged:
+            logged = True
+            log()
+
+    def close_and_log():
+        try:
+            close()
+        finally:
+            log_once()
+
+    async def aclose_and_log():
+        try:
+            await aclose()
+        finally:
+            log_once()
+
+    response.close = close_and_log
+    response.aclose = aclose_and_log
+
+
+def _send_streaming(client: httpx.Client, method: str, url: str, **kwargs) -> httpx.Response:
+    if isinstance(client, CachedClient):
+        # Cached responses are already buffered; iter_bytes() still works on them
+        return client.request(method, url, **kwargs)
+    response = client.send(client.build_request(method, url, **kwargs), stream=True)
+    if response.status_code >= 400:
+        # Error bodies are small: read them so the connection is released even if the caller retries
+        response.read()
+    return response
+
+
+def send_streaming(method: str, url: str, retry: bool = False, **kwargs) -> httpx.Response:
+    """Send a request on the shared client without buffering the response body.
+
+    Consume the body with `response.iter_bytes()` (or `iter_json_array`) and
+    close the response when done. When the HTTP cache is enabled the
+    response comes from (and is saved to) the cache, buffered as usual.
+    """
+    if retry:
+        return retry_policy.call(url, lambda: send_streaming(method, url, **kwargs))
+
+    client = _get_or_create_client()
+    trace = RequestTrace()
+    start = time.time()
+    response = None
+
+    try:
+        response = _send_streaming(client, method, url, **_with_trace(kwargs, trace.callback))
+        if _client_config['record_dir']:
+            # Recording needs the whole body; streaming resumes from the buffered copy
+            response.read()
+            _record_response(method, response)
+    except Exception as e:
+        _log_request(method, url, start, response, str(e), trace)
+        raise
+
+    # The body downloads while the caller iterates: log once it's closed
+    _log_when_closed(response, lambda: _log_request(method, url, start, response, None, trace))
+    return response
+
+
+async def async_send_streaming(client, method: str, url: str, retry: bool = False, **kwargs) -> httpx.Response:
+    """Async counterpart of `send_streaming`; close with `await response.aclose()`."""
+    if retry:
+        return await retry_policy.call_async(url, lambda: async_send_streaming(client, method, url, **kwargs))
+
+    trace = RequestTrace()
+    start = time.time()
+    response = None
+    kwargs = _with_trace(kwargs, trace.async_callback)
+
+    try:
+        if isinstance(client, AsyncCachedClient):
+            response = await client.request(method, url, **kwargs)
+        else:
+            response = await client.send(client.build_request(method, url, **kwargs), stream=True)
+            if response.status_code >= 400 or _client_config['record_dir']:
+                await response.aread()
+        _record_response(method, response)
+    except Exception as e:
+        _log_request(method, url, start, response, str(e), trace)
+        raise
+
+    _log_when_closed(response, lambda: _log_request(method, url, start, response, None, trace))
+    return response
+
+
+class JSONArrayParser:
+    """Incremental parser for a top-level JSON array, fed one chunk of bytes at a time.
+
+    Only the current partial element is buffered, so a multi-MB array is
+    parsed with a small, roughly constant buffer while it downloads.
+
+    Usage:
+        parser = JSONArrayParser()
+        for chunk in response.iter_bytes():
+            yield from parser.feed(chunk)
+        parser.close()
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._after_value = False
+        self._need_value = False
+
+    def feed(self, chunk: bytes, final: bool = False) -> list:
+        """Add bytes; returns the elements completed by them.
+
+        Raises:
+            ValueError: On malformed JSON or anything but whitespace after the array
+        """
+        self._buffer += self._text.decode(chunk, final=final)
+        items = []
+        buffer = self._buffer
+        pos = 0
+        end = len(buffer)
+
+        while True:
+            while pos < end and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos == end:
+                break
+
+            if self._finished:
+                raise ValueError(f"Unexpected data after the JSON array: {buffer[pos:pos + 20]!r}")
+
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 20]!r}")
+                self._started = True
+                pos += 1
+                continue
+
+            char = buffer[pos]
+            if self._after_value:
+                # Between elements only a separator or the closing bracket may follow
+                if char not in ",]":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos:pos + 20]!r}")
+                pos += 1
+                self._after_value = False
+                self._finished = char == "]"
+                self._need_value = char == ","
+                continue
+
+            if char == "]" and not self._need_value:
+                self._finished = True
+                pos += 1
+                continue
+
+            try:
+                item, item_end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # element not complete yet
+            if not final and not isinstance(item, (dict, list, str)):
+                # A number or literal is only complete once a delimiter follows it:
+                # "1." + "5" must not parse as 1 followed by garbage
+                if item_end == end or buffer[item_end] not in ",] \t\r\n":
+                    break
+            items.append(item)
+            pos = item_end
+            self._after_value = True
+            self._need_value = False
+
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self):
+        """Check the array was complete; raises ValueError on a truncated body."""
+        self.feed(b"", final=True)
+        if not self._finished:
+            raise ValueError("Truncated JSON array: response ended before the closing bracket")
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Yield the elements of a JSON array from an iterable of byte chunks."""
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+async def aiter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator:
+    """Async counterpart of `iter_json_array`, e.g. over `response.aiter_bytes()`."""
+    parser = JSONArrayParser()
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    parser.close()
 
 
 def get(url: str, **kwargs) -> httpx.Response:
@@ -168,12 +1343,24 @@ def put(url: str, **kwargs) -> httpx.Response:
 def delete(url: str, **kwargs) -> httpx.Response:
     return _logged_request("DELETE", url, **kwargs)
 
+
+async def async_get(client, url: str, **kwargs) -> httpx.Response:
+    return await async_request(client, "GET", url, **kwargs)
+
+
+async def async_post(client, url: str, **kwargs) -> httpx.Response:
+    return await async_request(client, "POST", url, **kwargs)
+
 def get_client(**overrides) -> Union[httpx.Client, CachedClient]:
     return _get_or_create_client(**overrides)
 
 def configure_http(**config):
-    global _client_config, _client
-    _client_config.update(config)
-    if _client:
-        _client.close()
-        _client = None
\ No newline at end of file
+    global _client_config, _client, _cache_manager
+    with _client_lock:
+        _client_config.update(config)
+        if _client:
+            _client.close()
+            _client = None
+        if _cache_manager is not None and hasattr(_cache_manager, "close"):
+            _cache_manager.close()
+        _cache_manager = None
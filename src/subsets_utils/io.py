@@ -2,18 +2,236 @@ import os
 import io
 import json
 import gzip
+import re
 import uuid
-from datetime import datetime
+import hashlib
+from datetime import datetime, date
 from pathlib import Path
+from typing import Optional
 import pyarrow as pa
 import pyarrow.parquet as pq
-from deltalake import write_deltalake, DeltaTable
+from deltalake import write_deltalake, DeltaTable, CommitProperties, WriterProperties
+from deltalake.exceptions import TableNotFoundError
 from . import debug
 from .environment import get_data_dir
 from .r2 import is_cloud_mode, upload_bytes, upload_file, upload_fileobj, download_bytes, get_storage_options, get_delta_table_uri, get_bucket_name, get_connector_name
 
 
-def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode: str = "append", merge_key: str = None) -> str:
+# Commit metadata key holding the table's content fingerprint (see `table_fingerprint`)
+FINGERPRINT_KEY = "subsets.fingerprint"
+
+# Commits that rewrite files without changing the data; skipped when looking up the fingerprint
+_MAINTENANCE_OPERATIONS = ("OPTIMIZE", "VACUUM START", "VACUUM END", "CHECKPOINT")
+
+
+def table_fingerprint(data: pa.Table) -> dict:
+    """Order-independent content fingerprint of a table.
+
+    Every column gets a hash that is the (wrapping, 64-bit) sum of its
+    values' hashes, plus one row-level hash that ties values to their rows.
+    Sums don't depend on row order and add up across appended batches, so
+    the fingerprint of a table is maintained without ever re-reading it.
+    Hashes are computed by DuckDB directly over the Arrow buffers.
+
+    Returns:
+        Dict with rows, schema (hash), row_hash and columns {name: hash}
+    """
+    import duckdb
+
+    mask = (1 << 64) - 1
+    quoted = ['"' + name.replace('"', '""') + '"' for name in data.column_names]
+    sums = [f"sum(hash({column}))" for column in quoted]
+    if quoted:
+        sums.append(f"sum(hash({', '.join(quoted)}))")
+
+    con = duckdb.connect()
+    try:
+        con.register("fingerprint_source", data)
+        values = con.execute(f"SELECT {', '.join(sums)} FROM fingerprint_source").fetchone() if sums else ()
+    finally:
+        con.close()
+    values = [int(value or 0) & mask for value in values]
+
+    schema = data.schema.remove_metadata()
+    return {
+        "rows": data.num_rows,
+        "schema": hashlib.sha256(str(schema).encode("utf-8")).hexdigest()[:16],
+        "row_hash": f"{values[-1] if values else 0:016x}",
+        "columns": {name: f"{value:016x}" for name, value in zip(data.column_names, values)},
+    }
+
+
+def _combine_fingerprints(existing: Optional[dict], added: dict) -> Optional[dict]:
+    """Fingerprint of a table after appending a batch, or None if it can't be derived."""
+    if existing is None or existing.get("schema") != added["schema"]:
+        return None
+    mask = (1 << 64) - 1
+    return {
+        "rows": existing["rows"] + added["rows"],
+        "schema": added["schema"],
+        "row_hash": f"{(int(existing['row_hash'], 16) + int(added['row_hash'], 16)) & mask:016x}",
+        "columns": {
+            name: f"{(int(existing['columns'][name], 16) + int(value, 16)) & mask:016x}"
+            for name, value in added["columns"].items()
+        },
+    }
+
+
+def _open_delta_table(dataset_name: str) -> Optional[DeltaTable]:
+    """Open an existing Delta table (local or R2), or None if there isn't one."""
+    try:
+        if is_cloud_mode():
+            return DeltaTable(get_delta_table_uri(dataset_name), storage_options=get_storage_options())
+        table_path = Path(get_data_dir()) / "subsets" / dataset_name
+        if not table_path.exists():
+            return None
+        return DeltaTable(str(table_path))
+    except Exception:
+        return None
+
+
+def _stored_fingerprint(dt: DeltaTable) -> Optional[dict]:
+    """The fingerprint recorded by the latest data-changing commit (reads only the Delta log)."""
+    try:
+        history = dt.history(limit=20)
+    except Exception:
+        return None
+    for commit in history:
+        if FINGERPRINT_KEY in commit:
+            return json.loads(commit[FINGERPRINT_KEY])
+        if commit.get("operation") not in _MAINTENANCE_OPERATIONS:
+            # Written without a fingerprint (e.g. a merge): unknown
+            return None
+    return None
+
+
+def _fingerprint_commit(fingerprint: Optional[dict]) -> Optional[CommitProperties]:
+    if fingerprint is None:
+        return None
+    return CommitProperties(custom_metadata={FINGERPRINT_KEY: json.dumps(fingerprint)})
+
+
+def _delta_row_count(dt: DeltaTable) -> Optional[int]:
+    """Row count from the per-file statistics in the Delta log, or None if a file lacks stats."""
+    import pyarrow.compute as pc
+
+    actions = pa.table(dt.get_add_actions(flatten=True))
+    if actions.num_rows == 0:
+        return 0
+    if "num_records" not in actions.column_names or actions.column("num_records").null_count:
+        return None
+    return pc.sum(actions.column("num_records")).as_py()
+
+
+# Above this many distinct source values, prune with a min/max range instead of an IN list
+MAX_PRUNE_VALUES = 100
+
+
+def _quote_column(name: str) -> str:
+    # Plain lowercase names are left bare; anything else is quoted so case survives SQL parsing
+    if re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_literal(value) -> Optional[str]:
+    """Render a Python value as a SQL literal for a merge predicate, or None if unsupported."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (datetime, date)):
+        return f"'{value.isoformat()}'"
+    return None
+
+
+def _prune_predicate(data: pa.Table, columns: list) -> list:
+    """Target-side predicates bounding `columns` to the values present in the source batch.
+
+    Low-cardinality columns (partitions, years) become `target.col IN (...)`,
+    others a min/max range. Delta skips every file (and partition) whose
+    statistics fall outside, so the merge only reads files the batch can touch.
+    """
+    import pyarrow.compute as pc
+
+    clauses = []
+    for column in columns:
+        if column not in data.column_names:
+            continue
+        values = pc.unique(data.column(column).drop_null())
+        if len(values) == 0:
+            continue
+        target = f"target.{_quote_column(column)}"
+
+        if len(values) <= MAX_PRUNE_VALUES:
+            literals = [_sql_literal(v) for v in values.to_pylist()]
+            if None not in literals:
+                clauses.append(f"{target} IN ({', '.join(sorted(literals))})")
+                continue
+
+        bounds = pc.min_max(values).as_py()
+        low, high = _sql_literal(bounds["min"]), _sql_literal(bounds["max"])
+        if low is not None and high is not None:
+            clauses.append(f"{target} >= {low} AND {target} <= {high}")
+    return clauses
+
+
+def _merge_into(dt: DeltaTable, data: pa.Table, merge_key, writer_properties: WriterProperties = None,
+                prune_by: list = None) -> dict:
+    """Upsert `data` into `dt` on `merge_key` (one column or several) and report what changed.
+
+    The predicate is limited to the partitions and key ranges in `data`
+    (see `_prune_predicate`), and counts come from the merge metrics and
+    the Delta log's file statistics, so the cost scales with the batch,
+    not with the table.
+    """
+    keys = [merge_key] if isinstance(merge_key, str) else list(merge_key)
+    if prune_by is None:
+        partitions = list(dt.metadata().partition_columns)
+        prune_by = partitions + [k for k in keys if k not in partitions]
+
+    clauses = _prune_predicate(data, prune_by)
+    clauses += [f"target.{_quote_column(k)} = source.{_quote_column(k)}" for k in keys]
+    predicate = " AND ".join(clauses)
+
+    updates = {col: f"source.{_quote_column(col)}" for col in data.column_names}
+    metrics = (
+        dt.merge(
+            source=data,
+            predicate=predicate,
+            source_alias="source",
+            target_alias="target",
+            writer_properties=writer_properties
+        )
+        .when_matched_update(updates=updates)
+        .when_not_matched_insert(updates=updates)
+        .execute()
+    )
+
+    inserted = metrics.get("num_target_rows_inserted", 0)
+    updated = metrics.get("num_target_rows_updated", 0)
+    total = _delta_row_count(dt)
+    total_label = f"{total:,}" if total is not None else "unknown"
+    print(f"Merged: {inserted:,} inserted, {updated:,} updated, table now has {total_label} total rows "
+          f"({metrics.get('num_target_files_added', 0)} files added, "
+          f"{metrics.get('num_target_files_removed', 0)} removed, {metrics.get('execution_time_ms', 0)} ms)")
+    return {"inserted": inserted, "updated": updated, "total_rows": total, **metrics}
+
+
+def _writer_properties(compression: str, compression_level: Optional[int], row_group_size: Optional[int]) -> WriterProperties:
+    return WriterProperties(
+        compression=compression.upper(),
+        compression_level=compression_level,
+        max_row_group_size=row_group_size,
+    )
+
+
+def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode: str = "append", merge_key=None,
+                prune_by: list = None,
+                partition_by: list = None, sort_by: list = None, target_file_size: int = None,
+                row_group_size: int = None, compression: str = "zstd", compression_level: int = None) -> str:
     """Upload a PyArrow table to a Delta table.
 
     In local mode: writes to DATA_DIR/subsets/{dataset_name}
@@ -24,7 +242,21 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         dataset_name: Name of the dataset (used as directory name)
         metadata: Optional metadata dict with keys: title, description, columns
         mode: 'append', 'overwrite', or 'merge'
-        merge_key: Required when mode='merge', the column to merge on
+        merge_key: Required when mode='merge', the column, or list of columns
+            (e.g. ['year', 'state']), identifying a row
+        prune_by: Columns whose source values bound the merge (default: the
+            table's partition columns plus the merge keys); the target side
+            is limited to those values, so only matching files are read
+        partition_by: Columns to partition the table by (e.g. ['year']), so
+            readers filtering on them skip whole directories. Takes effect
+            when the table is created or overwritten; must match the
+            existing partitioning otherwise.
+        sort_by: Columns to sort each batch by before writing, so file and
+            row-group min/max statistics are tight and prune well
+        target_file_size: Target size of written data files, in bytes
+        row_group_size: Maximum rows per Parquet row group
+        compression: Parquet codec ('zstd', 'snappy', 'gzip', ...)
+        compression_level: Codec level, e.g. 1-22 for zstd
     """
     if mode not in ("append", "overwrite", "merge"):
         raise ValueError(f"Invalid mode '{mode}'. Must be 'append', 'overwrite', or 'merge'.")
@@ -44,10 +276,29 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
     mode_label = {"append": "Appending to", "overwrite": "Overwriting", "merge": "Merging into"}[mode]
     print(f"{mode_label} {dataset_name}: {len(data)} rows, {len(data.schema)} cols ({columns}), {size_mb} MB")
 
+    if sort_by:
+        data = data.sort_by([(column, "ascending") for column in sort_by])
+
     # Extract metadata for Delta table
     table_name = metadata.get("title") if metadata else None
     table_description = json.dumps(metadata) if metadata else None
 
+    writer_properties = _writer_properties(compression, compression_level, row_group_size)
+    layout = {
+        "partition_by": partition_by,
+        "target_file_size": target_file_size,
+        "writer_properties": writer_properties,
+    }
+
+    # Record the table's content fingerprint in the commit so `has_changed` never reads the data.
+    # Appends extend the previous fingerprint; merges can't be derived without the old rows.
+    fingerprint = table_fingerprint(data)
+    if mode == "append":
+        existing = _open_delta_table(dataset_name)
+        if existing is not None:
+            fingerprint = _combine_fingerprints(_stored_fingerprint(existing), fingerprint)
+    commit_properties = _fingerprint_commit(fingerprint)
+
     if is_cloud_mode():
         # Cloud mode: write directly to R2
         table_uri = get_delta_table_uri(dataset_name)
@@ -56,28 +307,20 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         if mode == "merge":
             try:
                 dt = DeltaTable(table_uri, storage_options=storage_options)
-                updates = {col: f"source.{col}" for col in data.column_names}
-                (
-                    dt.merge(
-                        source=data,
-                        predicate=f"target.{merge_key} = source.{merge_key}",
-                        source_alias="source",
-                        target_alias="target"
-                    )
-                    .when_matched_update(updates=updates)
-                    .when_not_matched_insert(updates=updates)
-                    .execute()
-                )
-                result = dt.to_pyarrow_table()
-                print(f"Merged: table now has {len(result)} total rows")
-            except Exception:
+            except TableNotFoundError:
+                dt = None
+            if dt is not None:
+                _merge_into(dt, data, merge_key, writer_properties, prune_by)
+            else:
                 # Table doesn't exist, create it
                 write_deltalake(
                     table_uri,
                     data,
                     storage_options=storage_options,
                     name=table_name,
-                    description=table_description
+                    description=table_description,
+                    commit_properties=commit_properties,
+                    **layout
                 )
                 print(f"Created new table {dataset_name}")
         else:
@@ -88,7 +331,9 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
                 storage_options=storage_options,
                 name=table_name,
                 description=table_description,
-                schema_mode="merge" if mode == "append" else "overwrite"
+                schema_mode="merge" if mode == "append" else "overwrite",
+                commit_properties=commit_properties,
+                **layout
             )
 
         output_path = table_uri
@@ -98,24 +343,12 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
 
         if mode == "merge":
             if not table_path.exists():
-                write_deltalake(str(table_path), data, name=table_name, description=table_description)
+                write_deltalake(str(table_path), data, name=table_name, description=table_description,
+                                commit_properties=commit_properties, **layout)
                 print(f"Created new table {dataset_name}")
             else:
                 dt = DeltaTable(str(table_path))
-                updates = {col: f"source.{col}" for col in data.column_names}
-                (
-                    dt.merge(
-                        source=data,
-                        predicate=f"target.{merge_key} = source.{merge_key}",
-                        source_alias="source",
-                        target_alias="target"
-                    )
-                    .when_matched_update(updates=updates)
-                    .when_not_matched_insert(updates=updates)
-                    .execute()
-                )
-                result = dt.to_pyarrow_table()
-                print(f"Merged: table now has {len(result)} total rows")
+                _merge_into(dt, data, merge_key, writer_properties, prune_by)
         else:
             write_deltalake(
                 str(table_path),
@@ -123,7 +356,9 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
                 mode=mode,
                 name=table_name,
                 description=table_description,
-                schema_mode="merge" if mode == "append" else "overwrite"
+                schema_mode="merge" if mode == "append" else "overwrite",
+                commit_properties=commit_properties,
+                **layout
             )
 
         output_path = str(table_path)
@@ -209,8 +444,11 @@ def save_state(asset: str, state_data: dict) -> str:
 def has_changed(new_data: pa.Table, asset_name: str) -> bool:
     """Check if new data differs from the existing asset.
 
-    Compares the new data with what's already stored in the Delta table.
-    Returns True if data has changed or if no previous data exists.
+    Compares the fingerprint of the new data (see `table_fingerprint`) with
+    the one `upload_data` recorded in the Delta commit metadata, so only the
+    Delta log is read, never the existing data. Row order doesn't matter.
+    Returns True if data has changed, if no previous data exists, or if the
+    stored table has no fingerprint (written before fingerprints, or by a merge).
 
     Args:
         new_data: The new PyArrow table to compare
@@ -219,50 +457,15 @@ def has_changed(new_data: pa.Table, asset_name: str) -> bool:
     Returns:
         bool: True if data has changed or doesn't exist, False if unchanged
     """
-    if is_cloud_mode():
-        table_uri = get_delta_table_uri(asset_name)
-        storage_options = get_storage_options()
-
-        try:
-            dt = DeltaTable(table_uri, storage_options=storage_options)
-            existing_data = dt.to_pyarrow_table()
-
-            if len(new_data) != len(existing_data):
-                return True
-
-            if new_data.schema != existing_data.schema:
-                return True
-
-            new_bytes = new_data.to_pandas().to_csv(index=False)
-            existing_bytes = existing_data.to_pandas().to_csv(index=False)
-
-            return new_bytes != existing_bytes
-
-        except Exception:
-            return True
-    else:
-        table_path = Path(get_data_dir()) / "subsets" / asset_name
-
-        if not table_path.exists():
-            return True
-
-        try:
-            dt = DeltaTable(str(table_path))
-            existing_data = dt.to_pyarrow_table()
-
-            if len(new_data) != len(existing_data):
-                return True
-
-            if new_data.schema != existing_data.schema:
-                return True
-
-            new_bytes = new_data.to_pandas().to_csv(index=False)
-            existing_bytes = existing_data.to_pandas().to_csv(index=False)
+    dt = _open_delta_table(asset_name)
+    if dt is None:
+        return True
 
-            return new_bytes != existing_bytes
+    stored = _stored_fingerprint(dt)
+    if stored is None:
+        return True
 
-        except Exception:
-            return True
+    return table_fingerprint(new_data) != stored
 
 
 def load_asset(asset_name: str) -> pa.Table:
@@ -522,3 +725,194 @@ def load_raw_parquet(asset_id: str) -> pa.Table:
         return pq.read_table(path)
 
 
+RAW_MANIFEST = "_manifest.json"
+
+
+def _get_raw_part_path(asset_id: str, filename: str) -> Path:
+    """Part directory: DATA_DIR/raw/asset_id/filename (local mode only)"""
+    path = Path(get_data_dir()) / "raw" / asset_id / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _get_raw_part_r2_key(asset_id: str, filename: str) -> str:
+    """R2 key for a raw part: {connector}/data/raw/asset_id/filename"""
+    connector = get_connector_name()
+    return f"{connector}/data/raw/{asset_id}/{filename}"
+
+
+def _write_raw_part(asset_id: str, filename: str, content: bytes) -> str:
+    if is_cloud_mode():
+        return upload_bytes(content, _get_raw_part_r2_key(asset_id, filename))
+    path = _get_raw_part_path(asset_id, filename)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return str(path)
+
+
+def _read_raw_part(asset_id: str, filename: str) -> Optional[bytes]:
+    if is_cloud_mode():
+        return download_bytes(_get_raw_part_r2_key(asset_id, filename))
+    path = Path(get_data_dir()) / "raw" / asset_id / filename
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def load_raw_manifest(asset_id: str) -> Optional[dict]:
+    """Load the part manifest written by `open_raw_writer`, or None if absent."""
+    data = _read_raw_part(asset_id, RAW_MANIFEST)
+    if data is None:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+class RawWriter:
+    """Streaming writer for raw assets too large to hold in memory.
+
+    Every `write()` call turns one batch into its own part file under
+    raw/{asset_id}/ (NDJSON or Parquet), so memory stays bounded by one
+    batch. Part names may contain '/' for partitioned layouts, e.g.
+    'year=2019/part-00000'. A `_manifest.json` listing the parts is
+    written on close.
+
+    Use via `open_raw_writer()`.
+    """
+
+    def __init__(self, asset_id: str, fmt: str = "ndjson", resume: bool = False):
+        if fmt not in ("ndjson", "parquet"):
+            raise ValueError(f"Invalid format '{fmt}'. Must be 'ndjson' or 'parquet'.")
+        self.asset_id = asset_id
+        self.fmt = fmt
+        self.parts = {}
+        self._next_part = 0
+
+        if resume:
+            manifest = load_raw_manifest(asset_id)
+            if manifest and manifest["format"] == fmt:
+                self.parts = {p["name"]: p for p in manifest["parts"]}
+                self._next_part = len(self.parts)
+
+    def has_part(self, part: str) -> bool:
+        return part in self.parts
+
+    @property
+    def total_rows(self) -> int:
+        return sum(p["rows"] for p in self.parts.values())
+
+    def write(self, batch, part: str = None) -> str:
+        """Write one batch as a part file.
+
+        Args:
+            batch: List of dicts, or a PyArrow Table/RecordBatch
+            part: Optional part name; defaults to part-00000, part-00001, ...
+                Writing an existing part name replaces that part.
+
+        Returns:
+            Path or URI of the part file
+        """
+        if part is None:
+            part = f"part-{self._next_part:05d}"
+            self._next_part += 1
+
+        if self.fmt == "ndjson":
+            if isinstance(batch, (pa.Table, pa.RecordBatch)):
+                batch = batch.to_pylist()
+            content = "".join(json.dumps(r) + "\n" for r in batch).encode('utf-8')
+            rows = len(batch)
+        else:
+            if isinstance(batch, pa.RecordBatch):
+                batch = pa.Table.from_batches([batch])
+            elif not isinstance(batch, pa.Table):
+                batch = pa.Table.from_pylist(batch)
+            buffer = io.BytesIO()
+            pq.write_table(batch, buffer, compression='snappy')
+            content = buffer.getvalue()
+            rows = batch.num_rows
+
+        filename = f"{part}.{self.fmt}"
+        uri = _write_raw_part(self.asset_id, filename, content)
+        self.parts[part] = {"name": part, "file": filename, "rows": rows}
+        return uri
+
+    def checkpoint(self) -> str:
+        """Write the manifest for the parts so far, so `resume=True` can pick them up."""
+        manifest = {
+            "format": self.fmt,
+            "total_rows": self.total_rows,
+            "parts": [self.parts[name] for name in sorted(self.parts)],
+            "updated_at": datetime.now().isoformat(),
+        }
+        return _write_raw_part(self.asset_id, RAW_MANIFEST, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    def close(self) -> str:
+        """Write the manifest and (locally) drop part files it no longer lists."""
+        uri = self.checkpoint()
+
+        if not is_cloud_mode():
+            keep = {p["file"] for p in self.parts.values()} | {RAW_MANIFEST}
+            asset_dir = Path(get_data_dir()) / "raw" / self.asset_id
+            for path in asset_dir.rglob("*"):
+                if path.is_file() and path.relative_to(asset_dir).as_posix() not in keep:
+                    path.unlink()
+
+        target = "R2" if is_cloud_mode() else "Raw Cache"
+        print(f"  -> {target}: Saved {self.asset_id}/ ({len(self.parts)} parts, {self.total_rows:,} rows)")
+        return uri
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Only publish a manifest for complete writes
+        if exc_type is None:
+            self.close()
+
+
+def open_raw_writer(asset_id: str, fmt: str = "ndjson", resume: bool = False) -> RawWriter:
+    """Open a streaming raw writer that appends batches as part files.
+
+    In local mode: writes to DATA_DIR/raw/{asset_id}/part-NNNNN.{fmt}
+    In cloud mode: uploads each part to R2 as it is written (no disk write)
+
+    Usage:
+        with open_raw_writer("tri_facilities") as writer:
+            for page in pages:
+                writer.write(page)
+
+    Args:
+        asset_id: Identifier for the asset
+        fmt: 'ndjson' or 'parquet'
+        resume: Keep the parts of the existing manifest (same format only);
+            parts written again under the same name replace them
+    """
+    return RawWriter(asset_id, fmt, resume)
+
+
+def iter_raw_batches(asset_id: str):
+    """Yield the parts of a raw asset written by `open_raw_writer`, in part order.
+
+    NDJSON parts are yielded as lists of dicts, Parquet parts as PyArrow tables.
+    """
+    manifest = load_raw_manifest(asset_id)
+    if manifest is None:
+        raise FileNotFoundError(f"Raw asset '{asset_id}/' not found.")
+
+    for part in manifest["parts"]:
+        data = _read_raw_part(asset_id, part["file"])
+        if data is None:
+            raise FileNotFoundError(f"Raw part '{asset_id}/{part['file']}' not found.")
+
+        if manifest["format"] == "ndjson":
+            yield [json.loads(line) for line in data.decode('utf-8').splitlines() if line]
+        else:
+            yield pq.read_table(io.BytesIO(data))
+
+
+def iter_raw_records(asset_id: str):
+    """Yield raw records (dicts) one part at a time, so only one part is in memory."""
+    for batch in iter_raw_batches(asset_id):
+        if isinstance(batch, pa.Table):
+            batch = batch.to_pylist()
+        yield from batch
@@ -0,0 +1,139 @@
+"""Delta table maintenance: compaction, log checkpoints and vacuum.
+
+Appends and per-year merges leave many small files and a long _delta_log
+behind, which slows down every later DeltaTable(...) open and publish,
+especially over R2. `maintain_table` compacts small files (optionally
+Z-ordering them), writes a log checkpoint, drops expired log entries and
+vacuums files tombstoned longer ago than the retention window.
+
+Usage:
+    from subsets_utils import maintain_table, maintain_all
+    maintain_table("epa_ghg_emissions_by_state")
+    maintain_all()   # every table under data/subsets/
+
+Run after a successful connector run with `python -m subsets_utils.runner --maintain`
+(or RUN_DELTA_MAINTENANCE=true).
+"""
+
+import os
+import time
+from pathlib import Path
+from deltalake import DeltaTable
+from deltalake.exceptions import TableNotFoundError
+from . import debug
+from .environment import get_data_dir
+from .r2 import is_cloud_mode, get_s3_client, get_bucket_name, get_connector_name, get_delta_table_uri, get_storage_options
+
+# Tombstoned files younger than this are kept, so readers of recent versions don't break
+DEFAULT_RETENTION_HOURS = int(os.environ.get('DELTA_RETENTION_HOURS', '168'))
+
+# Compaction target; files below it are candidates for rewriting
+DEFAULT_TARGET_FILE_SIZE = int(os.environ.get('DELTA_TARGET_FILE_SIZE', str(128 * 1024 * 1024)))
+
+
+def _open(dataset_name: str) -> tuple:
+    """Open a table and time it; returns (DeltaTable, seconds)."""
+    start = time.monotonic()
+    if is_cloud_mode():
+        dt = DeltaTable(get_delta_table_uri(dataset_name), storage_options=get_storage_options())
+    else:
+        dt = DeltaTable(str(Path(get_data_dir()) / "subsets" / dataset_name))
+    return dt, time.monotonic() - start
+
+
+def list_datasets() -> list:
+    """Names of all Delta tables under data/subsets/ (local or R2)."""
+    if is_cloud_mode():
+        prefix = f"{get_connector_name()}/data/subsets/"
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        names = []
+        for page in paginator.paginate(Bucket=get_bucket_name(), Prefix=prefix, Delimiter="/"):
+            for common in page.get("CommonPrefixes", []):
+                names.append(common["Prefix"][len(prefix):].rstrip("/"))
+        return sorted(names)
+
+    subsets_dir = Path(get_data_dir()) / "subsets"
+    if not subsets_dir.exists():
+        return []
+    return sorted(p.name for p in subsets_dir.iterdir() if (p / "_delta_log").is_dir())
+
+
+def maintain_table(dataset_name: str, retention_hours: int = DEFAULT_RETENTION_HOURS,
+                   target_size: int = DEFAULT_TARGET_FILE_SIZE, z_order_by: list = None,
+                   vacuum: bool = True) -> dict:
+    """
+    Compact, checkpoint and vacuum one Delta table.
+
+    Args:
+        dataset_name: Name of the dataset (directory under data/subsets/)
+        retention_hours: Only vacuum files tombstoned longer ago than this
+        target_size: Target file size in bytes for compaction
+        z_order_by: Z-order these columns while compacting (rewrites all
+            files, so use for tables read with filters on these columns)
+        vacuum: Delete tombstoned files past retention
+
+    Returns:
+        Dict with before/after file counts, versions, open latency (s),
+        files compacted and vacuumed
+    """
+    dt, open_before = _open(dataset_name)
+    files_before = len(dt.files())
+    version_before = dt.version()
+
+    if z_order_by:
+        optimize = dt.optimize.z_order(z_order_by, target_size=target_size)
+    else:
+        optimize = dt.optimize.compact(target_size=target_size)
+
+    # A checkpoint lets readers load one Parquet file instead of replaying every JSON commit
+    dt.create_checkpoint()
+    dt.cleanup_metadata()
+
+    vacuumed = []
+    if vacuum:
+        vacuumed = dt.vacuum(retention_hours=retention_hours, dry_run=False, enforce_retention_duration=False)
+
+    dt, open_after = _open(dataset_name)
+    report = {
+        "dataset": dataset_name,
+        "files_before": files_before,
+        "files_after": len(dt.files()),
+        "files_added": optimize.get("numFilesAdded", 0),
+        "files_removed": optimize.get("numFilesRemoved", 0),
+        "files_vacuumed": len(vacuumed),
+        "version_before": version_before,
+        "version_after": dt.version(),
+        "open_seconds_before": round(open_before, 3),
+        "open_seconds_after": round(open_after, 3),
+    }
+
+    print(f"  {dataset_name}: {report['files_before']} -> {report['files_after']} files "
+          f"({report['files_removed']} compacted into {report['files_added']}, {report['files_vacuumed']} vacuumed), "
+          f"open {report['open_seconds_before']}s -> {report['open_seconds_after']}s")
+    debug.log_table_maintenance(**report)
+    return report
+
+
+def maintain_all(dataset_names: list = None, **options) -> list:
+    """
+    Run `maintain_table` on several tables, continuing past failures.
+
+    Args:
+        dataset_names: Tables to maintain (default: all, see `list_datasets`)
+        **options: Passed to `maintain_table`
+
+    Returns:
+        List of reports for the tables that were maintained
+    """
+    names = dataset_names if dataset_names is not None else list_datasets()
+    print(f"Maintaining {len(names)} Delta tables...")
+
+    reports = []
+    for name in names:
+        try:
+            reports.append(maintain_table(name, **options))
+        except TableNotFoundError:
+            print(f"  {name}: no Delta table, skipped")
+        except Exception as e:
+            print(f"  {name}: maintenance failed: {e}")
+    return reports
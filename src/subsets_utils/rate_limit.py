@@ -0,0 +1,162 @@
+"""Token-bucket rate limit shared between processes.
+
+A per-process limiter only sees its own requests: split a crawl over N
+processes (or N GitHub Actions jobs) and the source sees N times the
+intended rate. `SharedRateLimit` draws every request from one token bucket
+whose state lives in a coordinator all workers can reach:
+
+- `FileCoordinator`: a JSON file guarded by fcntl.flock, for processes on
+  one machine (HTTP_RATE_LIMIT_FILE)
+- `LocalCoordinator`: in-memory, for a single process (tests, default)
+- anything implementing `RateCoordinator.take` (Redis, a lock service, ...)
+  for workers on different machines, installed with `set_rate_coordinator`
+
+Usage:
+    limit = shared_rate_limit("data.epa.gov")   # None unless configured
+    wait = limit.try_take()                     # 0.0 = go, else seconds to wait
+"""
+
+import os
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class RateCoordinator(ABC):
+    """Holds token buckets; implementations must make `take` atomic across all workers."""
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """Take one token from bucket `key`, refilled at `rate` tokens/s up to `burst`.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one is available
+            (nothing is taken in that case)
+        """
+
+
+def _refill(bucket: Optional[dict], rate: float, burst: float, now: float):
+    """Apply one take to a bucket dict; returns (new_bucket, wait)."""
+    if bucket is None:
+        tokens = burst
+    else:
+        tokens = min(burst, bucket["tokens"] + max(0.0, now - bucket["updated"]) * rate)
+
+    if tokens >= 1.0:
+        return {"tokens": tokens - 1.0, "updated": now}, 0.0
+    return {"tokens": tokens, "updated": now}, (1.0 - tokens) / rate
+
+
+class LocalCoordinator(RateCoordinator):
+    """In-process buckets; only limits the threads of one process."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        with self._lock:
+            self._buckets[key], wait = _refill(self._buckets.get(key), rate, burst, time.time())
+            return wait
+
+
+class FileCoordinator(RateCoordinator):
+    """Buckets stored in a JSON file, locked with flock, shared by all processes on a host.
+
+    Bucket timestamps are wall-clock so every process agrees on refill time.
+    """
+
+    def __init__(self, path):
+        if fcntl is None:
+            raise RuntimeError("FileCoordinator needs fcntl (POSIX only)")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # flock excludes other processes; threads of this process share the fd, so also need a lock
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a+b")
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        with self._lock:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                self._file.seek(0)
+                raw = self._file.read()
+                try:
+                    buckets = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    buckets = {}
+
+                buckets[key], wait = _refill(buckets.get(key), rate, burst, time.time())
+
+                self._file.seek(0)
+                self._file.truncate()
+                self._file.write(json.dumps(buckets).encode("utf-8"))
+                self._file.flush()
+                return wait
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def close(self):
+        self._file.close()
+
+
+class SharedRateLimit:
+    """One named token bucket on a coordinator, e.g. a global requests/second cap for a host."""
+
+    def __init__(self, coordinator: RateCoordinator, key: str, rate: float, burst: float = 1.0):
+        self.coordinator = coordinator
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+
+    def try_take(self) -> float:
+        """0.0 if this request may go now, otherwise seconds to wait before trying again."""
+        return self.coordinator.take(self.key, self.rate, self.burst)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def set_rate_coordinator(coordinator: Optional[RateCoordinator]):
+    """Install the coordinator `shared_rate_limit` uses (overrides HTTP_RATE_LIMIT_FILE)."""
+    global _coordinator
+    with _coordinator_lock:
+        _coordinator = coordinator
+
+
+def get_rate_coordinator() -> Optional[RateCoordinator]:
+    """The installed coordinator, or a FileCoordinator on HTTP_RATE_LIMIT_FILE, or None."""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None and os.environ.get('HTTP_RATE_LIMIT_FILE'):
+            _coordinator = FileCoordinator(os.environ['HTTP_RATE_LIMIT_FILE'])
+        return _coordinator
+
+
+def shared_rate_limit(key: str, rate: Optional[float] = None, burst: Optional[float] = None) -> Optional[SharedRateLimit]:
+    """
+    Get the cross-worker rate limit for `key`, if a coordinator is configured.
+
+    Args:
+        key: Bucket name, usually the host being limited
+        rate: Total requests/second across all workers (default HTTP_SHARED_RATE, 5)
+        burst: Bucket size (default HTTP_SHARED_BURST, 1 = evenly spaced requests)
+
+    Returns:
+        SharedRateLimit, or None when no coordinator is configured
+    """
+    coordinator = get_rate_coordinator()
+    if coordinator is None:
+        return None
+    rate = rate or float(os.environ.get('HTTP_SHARED_RATE', '5'))
+    burst = burst or float(os.environ.get('HTTP_SHARED_BURST', '1'))
+    return SharedRateLimit(coordinator, key, rate, burst)
@@ -8,6 +8,7 @@ handles subprocess management, memory profiling, signal handling, and log evacua
 Usage:
     python -m subsets_utils.runner
     python -m subsets_utils.runner --ingest-only
+    python -m subsets_utils.runner --maintain      # compact/checkpoint/vacuum Delta tables after a successful run
 """
 
 import argparse
@@ -132,9 +133,21 @@ def write_error_log(log_dir: Path, exit_code: int, output_file: Path, tail_lines
         f.writelines(tail)
 
 
+def run_maintenance():
+    """Post-run Delta maintenance; failures are reported but never fail the run."""
+    try:
+        from .maintenance import maintain_all
+        maintain_all()
+    except Exception as e:
+        print(f"Delta maintenance failed: {e}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run connector under supervision")
     parser.add_argument("--ingest-only", action="store_true", help="Only run ingestion")
+    parser.add_argument("--maintain", action="store_true",
+                        help="Compact, checkpoint and vacuum Delta tables after a successful run "
+                             "(also enabled by RUN_DELTA_MAINTENANCE=true)")
     args = parser.parse_args()
 
     # Detect connector name from cwd (e.g., /path/to/integrations/accelerators -> accelerators)
@@ -222,6 +235,8 @@ def main():
 
     if exit_code == 0:
         print(f"Connector completed successfully")
+        if args.maintain or os.environ.get('RUN_DELTA_MAINTENANCE', '').lower() == 'true':
+            run_maintenance()
         debug.log_run_end(status="completed")
     elif exit_code == 137:
         print(f"Connector killed by OOM (exit code 137)")
@@ -8,7 +8,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import pyarrow as pa
 from collections import defaultdict
-from subsets_utils import load_raw_json, upload_data, publish
+from subsets_utils import iter_raw_records, upload_data, publish
 from transforms.ghg_emissions.test import test_by_state, test_by_sector, test_by_gas
 
 
@@ -166,36 +166,34 @@ def aggregate_by_gas(raw_data):
 
 def run():
     """Transform GHG emissions into aggregate datasets."""
-    # Load raw data
-    print("  Loading raw GHG emissions data...")
-    raw_gas = load_raw_json("ghg_emissions")
-    raw_sector = load_raw_json("ghg_emissions_by_sector")
+    # Raw data is streamed one part (year) at a time rather than loaded whole
+    print("  Streaming raw GHG emissions data...")
 
     # 1. Emissions by state (from gas data which has state info)
     print("  Aggregating by state...")
-    state_records = aggregate_by_state(raw_gas)
+    state_records = aggregate_by_state(iter_raw_records("ghg_emissions"))
     state_table = pa.Table.from_pylist(state_records)
     print(f"    {len(state_table):,} state-year combinations")
     test_by_state(state_table)
-    upload_data(state_table, DATASETS["by_state"]["id"])
+    upload_data(state_table, DATASETS["by_state"]["id"], mode="merge", merge_key=["year", "state"])
     publish(DATASETS["by_state"]["id"], DATASETS["by_state"])
 
     # 2. Emissions by sector (from sector data)
     print("  Aggregating by sector...")
-    sector_records = aggregate_by_sector(raw_sector)
+    sector_records = aggregate_by_sector(iter_raw_records("ghg_emissions_by_sector"))
     sector_table = pa.Table.from_pylist(sector_records)
     print(f"    {len(sector_table):,} sector-year combinations")
     test_by_sector(sector_table)
-    upload_data(sector_table, DATASETS["by_sector"]["id"])
+    upload_data(sector_table, DATASETS["by_sector"]["id"], mode="merge", merge_key=["year", "sector"])
     publish(DATASETS["by_sector"]["id"], DATASETS["by_sector"])
 
     # 3. Emissions by gas type (from gas data)
     print("  Aggregating by gas type...")
-    gas_records = aggregate_by_gas(raw_gas)
+    gas_records = aggregate_by_gas(iter_raw_records("ghg_emissions"))
     gas_table = pa.Table.from_pylist(gas_records)
     print(f"    {len(gas_table):,} gas-year combinations")
     test_by_gas(gas_table)
-    upload_data(gas_table, DATASETS["by_gas"]["id"])
+    upload_data(gas_table, DATASETS["by_gas"]["id"], mode="merge", merge_key=["year", "gas_code"])
     publish(DATASETS["by_gas"]["id"], DATASETS["by_gas"])
 
     print("  Done!")
@@ -1,7 +1,7 @@
 """Transform EPA TRI facilities to dataset."""
 
 import pyarrow as pa
-from subsets_utils import load_raw_json, upload_data, publish
+from subsets_utils import iter_raw_records, upload_data, publish
 from .test import test
 
 DATASET_ID = "epa_tri_facilities"
@@ -46,13 +46,8 @@ SCHEMA = pa.schema([
 
 def run():
     """Transform raw TRI facilities to PyArrow table and upload."""
-    all_records = load_raw_json("tri_facilities")
-
-    if not all_records:
-        raise ValueError("No TRI facility records found")
-
     normalized_records = []
-    for record in all_records:
+    for record in iter_raw_records("tri_facilities"):
         normalized_records.append({
             'tri_facility_id': record.get('tri_facility_id'),
             'facility_name': record.get('facility_name'),
@@ -69,6 +64,9 @@ def run():
             'fac_closed_ind': record.get('fac_closed_ind'),
         })
 
+    if not normalized_records:
+        raise ValueError("No TRI facility records found")
+
     print(f"  Transformed {len(normalized_records):,} TRI facilities")
 
     table = pa.Table.from_pylist(normalized_records, schema=SCHEMA)